@@ -0,0 +1,122 @@
+"""Runs every workload of `benchmarks.workloads`, optionally comparing against a previous run.
+
+```sh
+python -m benchmarks --output before.json
+# ... make changes ...
+python -m benchmarks --output after.json --compare before.json
+```
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from typing import Any
+
+import liku
+from benchmarks._common import measure, report
+from benchmarks.workloads import WORKLOADS
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: list[str] | None = None, repeat: int = 5) -> list[dict[str, Any]]:
+    results = []
+    for name, workload in WORKLOADS.items():
+        if names and name not in names:
+            continue
+
+        try:
+            func = workload()
+        except ImportError as exc:
+            # htm and flask are optional
+            results.append({"name": name, "seconds": None, "error": f"skipped: {exc}"})
+            continue
+        results.append(measure(name, func, repeat))
+    return results
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> bool:
+    """Prints the change of every workload against a baseline.
+
+    Returns:
+        bool: Whether any workload got slower by more than `threshold` percent.
+    """
+    before = {r["name"]: r["seconds"] for r in baseline if r.get("seconds")}
+    width = max(len(r["name"]) for r in results)
+    regressed = False
+    for result in results:
+        name, seconds = result["name"], result.get("seconds")
+        if seconds is None or name not in before:
+            print(f"{name:<{width}}  not comparable")
+            continue
+
+        change = (seconds / before[name] - 1) * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:<{width}}  {before[name] * 1e6:12.1f} us -> "
+            f"{seconds * 1e6:12.1f} us  {change:+7.1f}%{flag}"
+        )
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("names", nargs="*", help="workloads to run, all by default")
+    parser.add_argument("-o", "--output", help="write the results into this JSON file")
+    parser.add_argument("-c", "--compare", help="JSON file of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="slowdown, in percent, reported as a regression (default: 10)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    results = run(args.names, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "liku": liku.__version__,
+                    "commit": _commit(),
+                    "python": platform.python_version(),
+                    "implementation": platform.python_implementation(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if not args.compare:
+        report(results)
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)["results"]
+    return 1 if compare(results, baseline, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import timeit
+from typing import Any, Callable
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int = 5) -> dict[str, Any]:
+    """Times `func`, picking the amount of loops automatically.
+
+    Args:
+        name (str): Name of the benchmark.
+        func (Callable[[], Any]): Function to benchmark.
+        repeat (int, optional): Amount of timing rounds. Defaults to 5.
+
+    Returns:
+        dict[str, Any]: Name, loops and best time per call, in seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"name": name, "loops": number, "seconds": best}
+
+
+def report(results: list[dict[str, Any]]):
+    """Prints benchmark results as a table."""
+    width = max(len(result["name"]) for result in results)
+    for result in results:
+        if result.get("seconds") is None:
+            print(f"{result['name']:<{width}}  {result.get('error', 'failed')}")
+            continue
+        print(f"{result['name']:<{width}}  {result['seconds'] * 1e6:12.1f} us")
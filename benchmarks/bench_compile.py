@@ -0,0 +1,33 @@
+"""Renders a card component built as a tree and compiled.
+
+Run with `python -m benchmarks.bench_compile`.
+"""
+
+import liku as e
+from benchmarks._common import measure, report
+
+
+def Card(title: str, description: str, href: str):
+    return e.div(
+        props={"class_": "rounded-md border p-4"},
+        children=[
+            e.h2(props={"class_": "text-lg font-bold"}, children=title),
+            e.p(props={"class_": "font-light"}, children=description),
+            e.a(props={"href": href, "class_": "underline"}, children="Read more"),
+        ],
+    )
+
+
+def run():
+    compiled = e.compile(Card)
+    args = ("Hello & welcome", "Some <b>description</b>", "/posts/1")
+    assert compiled(*args) == Card(*args).render()
+
+    return [
+        measure("tree", lambda: Card(*args).render()),
+        measure("compiled", lambda: compiled(*args)),
+    ]
+
+
+if __name__ == "__main__":
+    report(run())
@@ -0,0 +1,45 @@
+"""Measures the cost of nested context providers and of lazy children keeping their context.
+
+Run with `python -m benchmarks.bench_context`.
+"""
+
+import liku as e
+from benchmarks._common import measure, report
+from liku.context import Context, use_context
+
+DEPTH = 50
+
+ThemeContext = Context("theme")
+
+
+def Nested(depth: int, provide: bool):
+    def children():
+        theme = use_context(ThemeContext) if provide else "dark"
+        if depth == 0:
+            return e.span(children=theme)
+        return e.div(props={"class_": theme}, children=Nested(depth - 1, provide))
+
+    if provide:
+        return ThemeContext.Provider("dark", children)
+    return children()
+
+
+def Items(lazy: bool):
+    items = (e.li(children=str(i)) for i in range(1000))
+    return e.ul(children=items if lazy else list(items))
+
+
+def run():
+    plain = Nested(DEPTH, False)
+    assert plain.render() == Nested(DEPTH, True).render()
+    assert Items(False).render() == Items(True).render()
+    return [
+        measure("nested", lambda: Nested(DEPTH, False).render()),
+        measure("nested providers", lambda: Nested(DEPTH, True).render()),
+        measure("list children", lambda: Items(False).render()),
+        measure("lazy children", lambda: Items(True).render()),
+    ]
+
+
+if __name__ == "__main__":
+    report(run())
@@ -0,0 +1,38 @@
+"""Renders text-heavy pages, where escaping dominates, with every escaper.
+
+Run with `python -m benchmarks.bench_escape`.
+"""
+
+import liku as e
+from liku import escaping
+from benchmarks._common import measure, report
+
+PLAIN = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 6
+SPECIAL = "Tom & Jerry's <b>\"show\"</b> is back, 1 < 2 && 3 > 2. " * 6
+
+
+def article(paragraph: str, n: int = 64):
+    return e.article(
+        children=[
+            e.h1(children="Title"),
+            *[e.p(children=paragraph) for _ in range(n)],
+        ]
+    )
+
+
+def run():
+    pages = {"plain text": article(PLAIN), "text to escape": article(SPECIAL)}
+
+    results = []
+    try:
+        for page_name, page in pages.items():
+            for name in escaping.ESCAPERS:
+                escaping.set_escaper(name)
+                results.append(measure(f"{page_name} - {name}", page.render))
+    finally:
+        escaping.set_escaper("auto")
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
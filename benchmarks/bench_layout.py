@@ -0,0 +1,28 @@
+"""Compares rebuilding a layout on every render against a pre-rendered shell.
+
+Run with `python -m benchmarks.bench_layout`.
+"""
+
+import liku as e
+from benchmarks._common import measure, report
+from benchmarks.workloads import LOREM, Card, Layout
+
+
+def run():
+    shell = e.shell(Layout)
+
+    def content():
+        return e.div(
+            props={"id": "posts"},
+            children=[Card(f"Post {i}", LOREM) for i in range(5)],
+        )
+
+    assert shell(content()).render_bytes() == Layout(content()).render_bytes()
+    return [
+        measure("layout", lambda: Layout(content()).render_bytes()),
+        measure("shell", lambda: shell(content()).render_bytes()),
+    ]
+
+
+if __name__ == "__main__":
+    report(run())
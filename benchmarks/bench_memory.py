@@ -0,0 +1,106 @@
+"""Measures memory used per node with tracemalloc.
+
+Compares liku's slotted elements against the previous layout, where every element had
+an instance `__dict__` plus its own props dict and children list, and against documents
+stored as flat arrays.
+
+Run with `python -m benchmarks.bench_memory`.
+"""
+
+import gc
+import tracemalloc
+from typing import Any, Callable
+
+import liku as e
+from liku.document import DocumentBuilder
+
+
+class LegacyElement:
+    """Replica of the element layout used before `__slots__`."""
+
+    def __init__(self, props=None, children=None, safe=False):
+        if not props:
+            props = {}
+        if not children:
+            children = []
+
+        if not isinstance(children, list):
+            children = [children]
+
+        self.props = props
+        self.children = children
+        self.safe = safe
+
+
+def legacy_card(i: int):
+    return LegacyElement(
+        {"class_": "rounded-md border p-4"},
+        children=[
+            LegacyElement(children=f"Title {i}"),
+            LegacyElement(children=f"Description {i}"),
+            LegacyElement(),
+            LegacyElement(props={"href": "post"}, children="Read More"),
+        ],
+    )
+
+
+def card(i: int):
+    return e.div(
+        {"class_": "rounded-md border p-4"},
+        children=[
+            e.strong(children=f"Title {i}"),
+            e.p(children=f"Description {i}"),
+            e.hr(),
+            e.a(props={"href": "post"}, children="Read More"),
+        ],
+    )
+
+
+NODES_PER_CARD = 5
+
+
+def bytes_per_node(factory: Callable[[int], Any], n: int = 10000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        cards = [factory(i) for i in range(n)]
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del cards
+    return (end - start) / (n * NODES_PER_CARD)
+
+
+def document_bytes_per_node(n: int = 10000) -> float:
+    """Same as `bytes_per_node()`, for cards appended one by one into a `Document`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        builder = DocumentBuilder()
+        for i in range(n):
+            builder.append(card(i))
+        document = builder.build()
+        del builder
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del document
+    return (end - start) / (n * NODES_PER_CARD)
+
+
+def run():
+    return [
+        {"name": "legacy layout", "bytes_per_node": bytes_per_node(legacy_card)},
+        {"name": "slots layout", "bytes_per_node": bytes_per_node(card)},
+        {"name": "document", "bytes_per_node": document_bytes_per_node()},
+    ]
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(f"{result['name']:<14}  {result['bytes_per_node']:8.1f} bytes/node")
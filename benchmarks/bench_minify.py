@@ -0,0 +1,58 @@
+"""Compares the size and render time of a page with and without minified output.
+
+Run with `python -m benchmarks.bench_minify`.
+"""
+
+import liku as e
+from liku import minify
+from benchmarks._common import measure
+
+
+def form_page(n: int = 200):
+    return e.form(
+        props={"action": "/posts", "method": "post"},
+        children=[
+            e.div(
+                props={"class_": "field"},
+                children=[
+                    "\n    ",
+                    e.label(props={"for_": f"field-{i}"}, children=f"Field {i}"),
+                    "\n    ",
+                    e.input(
+                        props={
+                            "id": f"field-{i}",
+                            "name": f"field-{i}",
+                            "type": "text",
+                            "required": True,
+                            "disabled": False,
+                        }
+                    ),
+                    "\n",
+                ],
+            )
+            for i in range(n)
+        ],
+    )
+
+
+def run():
+    page = form_page()
+    results = []
+    try:
+        for enabled in (False, True):
+            minify.set_minify(enabled)
+            name = "minified" if enabled else "default"
+            result = measure(name, page.render)
+            result["bytes"] = len(page.render_bytes())
+            results.append(result)
+    finally:
+        minify.set_minify(False)
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(
+            f"{result['name']:<8}  {result['bytes']:8} bytes  "
+            f"{result['seconds'] * 1e6:10.1f} us"
+        )
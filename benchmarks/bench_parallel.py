@@ -0,0 +1,55 @@
+"""Compares serial rendering against parallel rendering of large tables.
+
+Run with `python -m benchmarks.bench_parallel`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import liku as e
+from liku.parallel import is_free_threaded, render_parallel
+from benchmarks._common import measure, report
+
+
+def Row(i: int):
+    return e.tr(
+        props={"class_": "border-b hover:bg-gray-100"},
+        children=[
+            e.td(props={"class_": "px-4 py-2"}, children=str(i)),
+            e.td(
+                props={"class_": "px-4 py-2"},
+                children=f"User {i} <user{i}@example.com>",
+            ),
+            e.td(
+                props={"class_": "px-4 py-2"},
+                children=e.a(props={"href": f"/users/{i}"}, children="Edit"),
+            ),
+        ],
+    )
+
+
+def Report(n: int):
+    return e.table(children=e.tbody(children=[Row(i) for i in range(n)]))
+
+
+def run():
+    print(f"free-threaded: {is_free_threaded()}")
+    results = []
+    with ThreadPoolExecutor() as threads, ProcessPoolExecutor() as processes:
+        for n in (1000, 10000, 50000):
+            page = Report(n)
+            results.append(measure(f"{n} rows - serial", page.render, repeat=3))
+            for name, executor in (("threads", threads), ("processes", processes)):
+                results.append(
+                    measure(
+                        f"{n} rows - {name}",
+                        lambda: render_parallel(
+                            page, threshold=1000, executor=executor
+                        ),
+                        repeat=3,
+                    )
+                )
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
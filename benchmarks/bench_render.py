@@ -0,0 +1,78 @@
+"""Compares the stack based renderer against the previous recursive renderer.
+
+Run with `python -m benchmarks.bench_render`.
+"""
+
+import html as htmllib
+
+import liku as e
+from liku.elements import HTMLElement
+from benchmarks._common import measure, report
+
+
+def legacy_render(elem: HTMLElement) -> str:
+    """The recursive renderer liku used before, where each element joins its children."""
+    if elem.tag_name is None:
+        return legacy_render_child(elem)
+
+    opening_tag = "<" + elem.tag_name
+    if len(elem.props) != 0:
+        opening_tag += " " + elem.format_props()
+
+    if elem.void_element:
+        return f"{opening_tag} />"
+
+    opening_tag += ">"
+    return f"{opening_tag}{legacy_render_child(elem)}</{elem.tag_name}>"
+
+
+def legacy_render_child(elem: HTMLElement) -> str:
+    def _render(child: HTMLElement | str):
+        if isinstance(child, HTMLElement):
+            return legacy_render(child)
+
+        if elem.safe:
+            return child
+        return htmllib.escape(child)
+
+    return "".join([_render(child) for child in elem.children if child is not None])
+
+
+def wide_tree(n: int = 5000):
+    return e.ul(
+        props={"class_": "list"},
+        children=[e.li(children=e.span(children=f"Item {i}")) for i in range(n)],
+    )
+
+
+def deep_tree(depth: int):
+    elem = e.span(children="leaf")
+    for _ in range(depth):
+        elem = e.div(props={"class_": "nested"}, children=elem)
+    return elem
+
+
+def _safe(name, func):
+    try:
+        func()
+    except RecursionError:
+        return {"name": name, "seconds": None, "error": "RecursionError"}
+    return measure(name, func)
+
+
+def run():
+    cases = {
+        "wide (5000 items)": wide_tree(),
+        "deep (200 levels)": deep_tree(200),
+        "deep (5000 levels)": deep_tree(5000),
+    }
+
+    results = []
+    for name, tree in cases.items():
+        results.append(_safe(f"{name} - legacy", lambda: legacy_render(tree)))
+        results.append(_safe(f"{name} - render", tree.render))
+    return results
+
+
+if __name__ == "__main__":
+    report(run())
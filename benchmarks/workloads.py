@@ -0,0 +1,202 @@
+"""Representative workloads, each building a page and rendering it.
+
+Every workload is a function returning a zero-argument callable, so the setup is not timed.
+"""
+
+from typing import Any, Callable
+
+import liku as e
+
+Workload = Callable[[], Callable[[], Any]]
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+    "exercitation <ullamco> laboris & nisi ut aliquip ex ea commodo consequat. "
+)
+
+
+def Card(title: str, description: str):
+    return e.div(
+        {"class_": "rounded-md border p-4"},
+        children=[
+            e.strong(children=title),
+            e.p(children=description),
+            e.a(
+                props={
+                    "href": "post",
+                    "class_": "underline text-blue-500 hover:cursor-pointer",
+                },
+                children="Read More",
+            ),
+        ],
+    )
+
+
+def Layout(children: e.HTMLNode):
+    return e.html(
+        children=[
+            e.head(
+                children=[
+                    e.title(children="Hello World!"),
+                    e.meta(props={"charset": "utf-8"}),
+                    e.meta(
+                        props={
+                            "name": "viewport",
+                            "content": "width=device-width, initial-scale=1",
+                        }
+                    ),
+                    e.script(props={"src": "https://cdn.tailwindcss.com"}),
+                ]
+            ),
+            e.body(
+                children=[
+                    e.div(
+                        props={"class_": "container mx-auto pt-8"},
+                        children=children,
+                    )
+                ]
+            ),
+        ]
+    )
+
+
+def wide_list(n: int = 2000):
+    def run():
+        return e.ul(
+            props={"class_": "list"},
+            children=[e.li(children=f"Item {i}") for i in range(n)],
+        ).render()
+
+    return run
+
+
+def deep_nesting(depth: int = 500):
+    def run():
+        elem = e.span(children="leaf")
+        for _ in range(depth):
+            elem = e.div(props={"class_": "nested"}, children=elem)
+        return elem.render()
+
+    return run
+
+
+def text_article(paragraphs: int = 100):
+    def run():
+        return e.article(
+            children=[
+                e.h1(children="Title"),
+                *[e.p(children=LOREM * 4) for _ in range(paragraphs)],
+            ]
+        ).render()
+
+    return run
+
+
+def attribute_form(fields: int = 200):
+    def run():
+        return e.form(
+            props={"action": "/submit", "method": "post", "class_": "flex flex-col"},
+            children=[
+                e.div(
+                    props={"class_": "field"},
+                    children=[
+                        e.label(
+                            props={"for_": f"f{i}", "class_": "label"},
+                            children=f"Field {i}",
+                        ),
+                        e.input(
+                            props={
+                                "id": f"f{i}",
+                                "name": f"field_{i}",
+                                "type": "text",
+                                "placeholder": f"Value of field {i}",
+                                "class_": "input rounded-md border px-2",
+                                "required": True,
+                                "maxlength": 64,
+                                "data-index": i,
+                            }
+                        ),
+                    ],
+                )
+                for i in range(fields)
+            ],
+        ).render()
+
+    return run
+
+
+def card_layout(cards: int = 50):
+    def run():
+        return Layout(
+            e.div(
+                props={"id": "posts", "class_": "flex flex-col gap-4"},
+                children=[Card(f"Post {i}", LOREM) for i in range(cards)],
+            )
+        ).render()
+
+    return run
+
+
+def dynamic_h(n: int = 1000):
+    tags = ["div", "span", "p", "custom-card", "x-item"]
+
+    def run():
+        return e.h(
+            "section",
+            children=[
+                e.h(tags[i % len(tags)], {"class_": "item"}, f"Item {i}")
+                for i in range(n)
+            ],
+        ).render()
+
+    return run
+
+
+def htm_template(cards: int = 20):
+    from liku.htm import html
+
+    def run():
+        # Expressions are evaluated with the locals of the caller
+        posts = [(f"Post {i}", LOREM) for i in range(cards)]  # noqa: F841
+        return html(
+            """
+            <div class="flex flex-col gap-4">
+                {{ e.Fragment(children=[Card(t, d) for t, d in posts]) }}
+            </div>
+            """
+        ).render()
+
+    return run
+
+
+def flask_component(cards: int = 50):
+    from flask import Flask
+
+    from liku.integrations.flask import component
+
+    app = Flask("benchmarks")
+
+    @app.get("/")
+    @component
+    def index():
+        return Layout([Card(f"Post {i}", LOREM) for i in range(cards)])
+
+    client = app.test_client()
+
+    def run():
+        return client.get("/", headers={"Accept-Encoding": "gzip"}).data
+
+    return run
+
+
+WORKLOADS: dict[str, Workload] = {
+    "wide list": wide_list,
+    "deep nesting": deep_nesting,
+    "text article": text_article,
+    "attribute form": attribute_form,
+    "card layout": card_layout,
+    "dynamic h()": dynamic_h,
+    "htm template": htm_template,
+    "flask component": flask_component,
+}
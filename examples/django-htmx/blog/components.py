@@ -30,6 +30,7 @@ def GeneratedPost(n: int, faker: Faker):
     )
 
 
+@e.shell
 def Layout(children: e.HTMLNode):
     return e.html(
         children=[
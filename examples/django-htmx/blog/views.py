@@ -8,12 +8,18 @@ from blog.components import GeneratedPost, HeaderRow, Layout
 faker = Faker()
 
 
+def render(component: e.HTMLElement):
+    response = HttpResponse()
+    component.render_into(response)
+    return response
+
+
 def random_post(request: HttpRequest):
-    return HttpResponse(GeneratedPost(random.randint(1, 10), faker))
+    return render(GeneratedPost(random.randint(1, 10), faker))
 
 
 def home(request: HttpRequest):
-    return HttpResponse(
+    return render(
         Layout(
             e.div(
                 props={"class_": "flex flex-col gap-4"},
@@ -27,7 +33,7 @@ def home(request: HttpRequest):
 
 
 def show_post(request: HttpRequest):
-    return HttpResponse(
+    return render(
         Layout(
             e.div(
                 props={"class_": "flex flex-col gap-4"},
@@ -1,4 +1,10 @@
 from liku.elements import *  # noqa: F403
+from liku.compiler import compile  # noqa: F401
+from liku.diff import diff  # noqa: F401
+from liku.escaping import Markup  # noqa: F401
+from liku.layout import Shell, Slot, shell  # noqa: F401
+from liku.memoize import memo  # noqa: F401
+from liku.suspense import Suspense  # noqa: F401
 
 __all__ = [  # noqa: F405
     "a",
@@ -0,0 +1,5 @@
+import sys
+
+from liku.cli import main
+
+sys.exit(main())
@@ -0,0 +1,126 @@
+"""Rendering of trees containing awaitables, such as the result of async components."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable
+from contextvars import Context
+import inspect
+from typing import Any
+
+from liku.context import Provided
+
+from liku.elements import (
+    _STREAM_FLUSH_PIECES,
+    HTMLElement,
+    HTMLNode,
+    _as_children,
+    _render_chunks,
+)
+
+AsyncHTMLNode = HTMLNode | Awaitable[Any]
+
+
+def _schedule(
+    node: Any, tasks: dict[int, asyncio.Future], context: Context | None = None
+):
+    """Starts every awaitable found in the tree as a task, so they all run concurrently.
+
+    Awaitables are run under the context snapshot of the closest `Provided` enclosing
+    them, or `context` if there is none.
+    """
+    # Walked in document order, so tasks start in that order
+    stack = [(node, context)]
+    while stack:
+        node, context = stack.pop()
+        if isinstance(node, str) or node is None:
+            continue
+
+        if isinstance(node, HTMLElement):
+            if node.__class__ is Provided:
+                context = node.context
+            if isinstance(node.children, (list, tuple)):
+                stack.extend((child, context) for child in reversed(node.children))
+        elif isinstance(node, list):
+            stack.extend((child, context) for child in reversed(node))
+        elif inspect.isawaitable(node) and id(node) not in tasks:
+            if context is not None and inspect.iscoroutine(node):
+                # A copy, as the same snapshot can be shared by several tasks
+                task = asyncio.get_running_loop().create_task(
+                    node, context=context.copy()
+                )
+            else:
+                task = asyncio.ensure_future(node)
+            tasks[id(node)] = task
+
+
+async def iter_render_async(
+    node: AsyncHTMLNode, chunk_size: int = 4096
+) -> AsyncIterator[str]:
+    """Renders the node lazily, resolving awaitables in the tree along the way.
+
+    Every awaitable in the tree starts running concurrently as soon as rendering starts,
+    and chunks are yielded in document order as the awaitables they wait on finish.
+
+    Args:
+        node (AsyncHTMLNode): Node to render, awaitables can be anywhere in the tree.
+        chunk_size (int, optional): Minimum length of each chunk, except the last one and
+            the ones yielded before waiting on an awaitable. Defaults to 4096.
+
+    Yields:
+        str: Chunks of rendered HTML, in document order.
+    """
+    tasks: dict[int, asyncio.Future] = {}
+    _schedule(node, tasks)
+
+    pieces = _render_chunks(_as_children(node), False, _STREAM_FLUSH_PIECES, True)
+    buffer: list[str] = []
+    size = 0
+    value = None
+    try:
+        while True:
+            try:
+                item = pieces.send(value)
+            except StopIteration:
+                break
+
+            value = None
+            if isinstance(item, str):
+                buffer.append(item)
+                size += len(item)
+                if size >= chunk_size:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    size = 0
+                continue
+
+            # Send out everything that is ready before waiting
+            if buffer:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+
+            task = tasks.pop(id(item), None)
+            value = await (item if task is None else task)
+            # Awaitables returned by a task belong to the context it ran under
+            context = task.get_context() if isinstance(task, asyncio.Task) else None
+            _schedule(value, tasks, context)
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+
+async def render_async(node: AsyncHTMLNode) -> str:
+    """Renders the node into HTML, resolving awaitables in the tree concurrently.
+
+    Gives the same HTML as `render()` would on the tree with every awaitable replaced by
+    its result.
+
+    Args:
+        node (AsyncHTMLNode): Node to render, awaitables can be anywhere in the tree.
+
+    Returns:
+        str: Rendered HTML.
+    """
+    return "".join([chunk async for chunk in iter_render_async(node, 2**62)])
@@ -0,0 +1,302 @@
+"""Static site generation: renders every route of a site into HTML files.
+
+Routes are given as a dict in a Python module, referred to as `module:attribute`, mapping
+each route into a component without arguments, or into a `Page` with the data given to its
+component. Pages are rendered by a pool of processes, which import that module themselves.
+
+Builds are incremental: a manifest in the output directory keeps the hash of the source files
+of every component, including the project modules it imports, and of its data, and pages
+whose hashes did not change are skipped.
+"""
+
+from collections.abc import Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import sysconfig
+import tempfile
+from types import ModuleType
+from typing import Any, NamedTuple
+
+from liku import __version__
+from liku.elements import Fragment, HTMLElement, HTMLNode
+
+MANIFEST_NAME = ".liku-build.json"
+
+
+class Page(NamedTuple):
+    """Component of a route, called with `data` when it is not None."""
+
+    component: Callable[..., HTMLNode]
+    data: Any = None
+
+
+class BuildResult(NamedTuple):
+    built: list[str]
+    skipped: list[str]
+    removed: list[str]
+
+
+Routes = Mapping[str, Page | Callable[[], HTMLNode]]
+
+
+def load_routes(spec: str) -> Routes:
+    """Imports the routes of a site.
+
+    Args:
+        spec (str): Module and attribute holding the routes, as `module:attribute`.
+
+    Raises:
+        ValueError: If `spec` is not of the form `module:attribute`.
+
+    Returns:
+        Routes: Mapping of routes into components or `Page`.
+    """
+    module_name, sep, attribute = spec.partition(":")
+    if not sep or not module_name or not attribute:
+        raise ValueError(f"Expected routes as 'module:attribute', got {spec!r}")
+
+    routes = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        routes = getattr(routes, name)
+    return routes  # type: ignore
+
+
+def output_path(route: str) -> str:
+    """Gets the file a route is written into, relative to the output directory.
+
+    `/` and `/docs/` are written into `index.html` and `docs/index.html`, `/about` into
+    `about/index.html`, and routes with an extension such as `/404.html` as-is.
+    """
+    parts = [part for part in route.split("/") if part]
+    if any(part in (".", "..") for part in parts):
+        raise ValueError(f"Invalid route {route!r}")
+
+    if not parts or route.endswith("/") or "." not in parts[-1]:
+        parts.append("index.html")
+    return os.path.join(*parts)
+
+
+def _as_page(page: Page | Callable[[], HTMLNode]) -> Page:
+    return page if isinstance(page, Page) else Page(page)
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _library_paths() -> tuple[str, ...]:
+    # Modules installed there, and liku itself, are covered by the version of liku
+    paths = sysconfig.get_paths()
+    libraries = [paths[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")]
+    libraries.append(os.path.dirname(os.path.abspath(__file__)))
+    return tuple(os.path.join(os.path.abspath(path), "") for path in libraries)
+
+
+def _project_file(module: ModuleType, libraries: tuple[str, ...]) -> str | None:
+    path = getattr(module, "__file__", None)
+    if not path or not path.endswith(".py") or not os.path.exists(path):
+        return None
+    path = os.path.abspath(path)
+    return None if path.startswith(libraries) else path
+
+
+def _imported_files(module: ModuleType) -> list[str]:
+    """Source files of the module and of every project module it imports, transitively.
+
+    Modules are found through the globals of each module: imported modules, and the
+    modules defining imported functions and classes.
+    """
+    libraries = _library_paths()
+    seen = {module.__name__}
+    stack = [module]
+    files = []
+    while stack:
+        module = stack.pop()
+        path = _project_file(module, libraries)
+        if path is None:
+            continue
+        files.append(path)
+
+        for value in list(vars(module).values()):
+            if isinstance(value, ModuleType):
+                imported = value
+            else:
+                name = getattr(value, "__module__", None)
+                imported = sys.modules.get(name) if isinstance(name, str) else None
+            if imported is not None and imported.__name__ not in seen:
+                seen.add(imported.__name__)
+                stack.append(imported)
+
+    return sorted(files)
+
+
+def _source_hash(component: Callable[..., Any], cache: dict[str, str]) -> str:
+    module = inspect.getmodule(inspect.unwrap(component))
+    if module is None or _project_file(module, _library_paths()) is None:
+        return _hash_bytes(f"{__version__}:{component!r}".encode())
+
+    if module.__name__ not in cache:
+        digest = hashlib.sha256(__version__.encode())
+        for path in _imported_files(module):
+            with open(path, "rb") as f:
+                digest.update(b"\0" + path.encode() + b"\0" + f.read())
+        cache[module.__name__] = digest.hexdigest()
+    return cache[module.__name__]
+
+
+def _canonical(value: Any) -> Any:
+    """Converts data into JSON with a single representation, whatever the run."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    name = f"{type(value).__module__}.{type(value).__qualname__}"
+    if isinstance(value, bytes):
+        return [name, value.hex()]
+    if isinstance(value, Mapping):
+        items = [(_canonical(key), _canonical(item)) for key, item in value.items()]
+        return [name, sorted(items, key=lambda item: json.dumps(item[0]))]
+    if isinstance(value, (set, frozenset)):
+        return [name, sorted((_canonical(item) for item in value), key=json.dumps)]
+    if isinstance(value, (list, tuple)):
+        return [name, [_canonical(item) for item in value]]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = dataclasses.fields(value)
+        return [
+            name,
+            {field.name: _canonical(getattr(value, field.name)) for field in fields},
+        ]
+    if hasattr(value, "__dict__"):
+        return [name, _canonical(vars(value))]
+    # Reprs with addresses differ on every run, so such pages are always rebuilt
+    return [name, repr(value)]
+
+
+def _data_hash(data: Any) -> str:
+    canonical = json.dumps(_canonical(data), separators=(",", ":"))
+    return _hash_bytes(canonical.encode())
+
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_atomic(path: str, write: Callable[[Any], Any], mode: str = "wb"):
+    """Writes a file through a temporary file, replacing it only once fully written.
+
+    Args:
+        path (str): File to write.
+        write (Callable[[IO], Any]): Called with the temporary file to write into.
+        mode (str, optional): Mode of the file. Defaults to "wb".
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        # Temporary files are only readable by their owner, unlike files created as usual
+        os.chmod(temporary, 0o666 & ~_umask())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def render_page(page: Page | Callable[[], HTMLNode], path: str):
+    """Renders a page into a file, atomically."""
+    page = _as_page(page)
+    node = page.component() if page.data is None else page.component(page.data)
+    if not isinstance(node, HTMLElement):
+        node = Fragment(children=node)
+    write_atomic(path, node.render_into)
+
+
+def _render_route(spec: str, route: str, path: str, sys_path: list[str]):
+    # Runs in the workers, which import the routes themselves
+    for entry in reversed(sys_path):
+        if entry not in sys.path:
+            sys.path.insert(0, entry)
+    render_page(load_routes(spec)[route], path)
+
+
+def _read_manifest(path: str) -> dict[str, dict[str, str]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(
+    spec: str,
+    output: str,
+    jobs: int | None = None,
+    force: bool = False,
+) -> BuildResult:
+    """Renders every route of a site into an output directory.
+
+    Args:
+        spec (str): Module and attribute holding the routes, see `load_routes()`.
+        output (str): Directory to write the pages into.
+        jobs (int | None, optional): Amount of worker processes, 1 renders in the current
+            process. Defaults to None, one per CPU.
+        force (bool, optional): Whether to render pages that did not change. Defaults to
+            False.
+
+    Returns:
+        BuildResult: Routes that were built, skipped, and removed since the last build.
+    """
+    routes = load_routes(spec)
+    manifest_path = os.path.join(output, MANIFEST_NAME)
+    previous = _read_manifest(manifest_path)
+
+    manifest: dict[str, dict[str, str]] = {}
+    sources: dict[str, str] = {}
+    todo: list[tuple[str, str]] = []
+    skipped = []
+    for route, page in routes.items():
+        page = _as_page(page)
+        entry = {
+            "path": output_path(route),
+            "source": _source_hash(page.component, sources),
+            "data": _data_hash(page.data),
+        }
+        manifest[route] = entry
+
+        path = os.path.join(output, entry["path"])
+        if not force and previous.get(route) == entry and os.path.exists(path):
+            skipped.append(route)
+        else:
+            todo.append((route, path))
+
+    if jobs == 1 or len(todo) <= 1:
+        for route, path in todo:
+            render_page(routes[route], path)
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [
+                executor.submit(_render_route, spec, route, path, sys.path)
+                for route, path in todo
+            ]
+            for future in futures:
+                future.result()
+
+    removed = []
+    for route, entry in previous.items():
+        if route in manifest:
+            continue
+        removed.append(route)
+        try:
+            os.unlink(os.path.join(output, entry["path"]))
+        except FileNotFoundError:
+            pass
+
+    write_atomic(manifest_path, lambda f: json.dump(manifest, f, indent=2), "w")
+    return BuildResult([route for route, _ in todo], skipped, removed)
@@ -0,0 +1,59 @@
+"""Command line interface, available as `liku` or `python -m liku`."""
+
+import argparse
+import os
+import sys
+
+from liku import build
+
+
+def _build(args: argparse.Namespace) -> int:
+    # Routes are imported like `python -m` would, from the current directory
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    result = build.build(args.routes, args.output, args.jobs, args.force)
+    for route in result.built:
+        print(f"built    {route}")
+    for route in result.removed:
+        print(f"removed  {route}")
+    print(
+        f"{len(result.built)} built, {len(result.skipped)} unchanged, "
+        f"{len(result.removed)} removed"
+    )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="liku")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build",
+        help="render the routes of a site into HTML files",
+        description=build.__doc__,
+    )
+    build_parser.add_argument(
+        "routes", help="module and attribute holding the routes, as module:attribute"
+    )
+    build_parser.add_argument(
+        "-o", "--output", default="build", help="output directory (default: build)"
+    )
+    build_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="amount of worker processes, 1 to render serially (default: one per CPU)",
+    )
+    build_parser.add_argument(
+        "--force", action="store_true", help="render pages that did not change"
+    )
+    build_parser.set_defaults(handler=_build)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
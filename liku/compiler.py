@@ -0,0 +1,259 @@
+"""Compiles components into specialised render functions.
+
+A component is traced once, called with a placeholder for each argument. The traced tree
+is rendered into static strings with holes where the placeholders ended up, and a Python
+function concatenating those strings with the escaped arguments is generated with `exec`.
+
+Only components always returning the same shape can be compiled: arguments must be used
+as-is, as children or as props values, optionally inside f-strings. Branching on an
+argument, or calling its methods, is traced with the placeholder and gives wrong results.
+"""
+
+import builtins
+import functools
+import inspect
+import re
+import sys
+from typing import Any, Callable, NamedTuple
+
+from liku import escaping, minify
+from liku.elements import (
+    HTMLElement,
+    _as_children,
+    _format_prop_key,
+    _format_prop_value,
+    _render_chunks,
+)
+
+_MARKER = re.compile("\x00liku([0-9]+)\x00")
+_SUPPORTED_KINDS = (
+    inspect.Parameter.POSITIONAL_ONLY,
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    inspect.Parameter.KEYWORD_ONLY,
+)
+
+
+class CompileError(ValueError):
+    """Raised when a component cannot be compiled."""
+
+
+class _Hole(NamedTuple):
+    # node: rendered as children, text: part of a text, prop: a whole prop value,
+    # prop_text: part of a prop value
+    kind: str
+    index: int
+    safe: bool = False
+
+
+def _marker(index: int) -> str:
+    return f"\x00liku{index}\x00"
+
+
+def _check_static(text: str):
+    if "\x00" in text:
+        raise CompileError(
+            "An argument is used in a way that cannot be compiled, arguments must be "
+            "used as-is as children or props values"
+        )
+
+
+def _split(text: str, kind: str, safe: bool, escape: escaping.Escaper) -> list:
+    ops: list[str | _Hole] = []
+    for i, part in enumerate(_MARKER.split(text)):
+        if i % 2 == 1:
+            ops.append(_Hole(kind, int(part), safe))
+        elif part:
+            _check_static(part)
+            ops.append(part if safe else escape(part))
+    return ops
+
+
+def _trace_props(props: dict[str, Any], escape: escaping.Escaper) -> list:
+    ops: list[str | _Hole] = []
+    for k, v in props.items():
+        if k == "key":
+            continue
+        ops.append(f' {_format_prop_key(k)}="')
+        if isinstance(v, str) and (match := _MARKER.fullmatch(v)):
+            ops.append(_Hole("prop", int(match.group(1))))
+        elif isinstance(v, str):
+            ops.extend(_split(v, "prop_text", False, escape))
+        else:
+            ops.append(_format_prop_value(v, escape))
+        ops.append('"')
+    return ops
+
+
+def _trace(node: Any) -> list:
+    """Renders a traced tree into static strings and holes, like `_render_chunks()`."""
+    escape = escaping.get_escaper()
+    ops: list[str | _Hole] = []
+    stack: list[tuple[Any, bool, str]] = []
+    children = iter(_as_children(node))
+    safe = False
+    closing_tag = ""
+
+    while True:
+        for child in children:
+            if isinstance(child, str):
+                if match := _MARKER.fullmatch(child):
+                    ops.append(_Hole("node", int(match.group(1)), safe))
+                else:
+                    ops.extend(_split(child, "text", safe, escape))
+                continue
+
+            if child is None:
+                continue
+
+            if not isinstance(child, HTMLElement):
+                raise CompileError(f"Cannot compile {child!r}")
+
+            cls = child.__class__
+            if cls._opaque:
+                rendered = child.render()
+                _check_static(rendered)
+                ops.append(rendered)
+                continue
+
+            if cls.tag_name is not None:
+                ops.append(cls._opening_tag)
+                if child.props:
+                    ops.extend(_trace_props(child.props, escape))
+                if cls.void_element:
+                    ops.append(" />")
+                    continue
+                ops.append(">")
+
+            stack.append((children, safe, closing_tag))
+            children = iter(child.children)
+            safe = child.safe
+            closing_tag = cls._closing_tag
+            break
+        else:
+            ops.append(closing_tag)
+            if not stack:
+                break
+            children, safe, closing_tag = stack.pop()
+
+    return ops
+
+
+def _render_node(node: Any, safe: bool) -> str:
+    return "".join(_render_chunks(_as_children(node), safe, sys.maxsize))
+
+
+def _merge(ops: list) -> list:
+    merged: list[str | _Hole] = []
+    for op in ops:
+        if isinstance(op, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += op
+        elif op != "":
+            merged.append(op)
+    return merged
+
+
+def compile[**P](component: Callable[P, Any]) -> Callable[P, escaping.Markup]:
+    """Compiles a component into a function rendering its HTML directly.
+
+    Calling the compiled function gives the same HTML as rendering the component, without
+    building its tree. See the module documentation for which components can be compiled.
+
+    Args:
+        component (Callable[P, HTMLNode]): Component to compile.
+
+    Raises:
+        CompileError: If the component uses its arguments in a way that cannot be compiled.
+        TypeError: If the component takes `*args` or `**kwargs`.
+
+    Returns:
+        Callable[P, Markup]: Function with the same signature as the component, returning
+        the rendered HTML as `Markup`, so it is not escaped again when used as a child.
+    """
+    signature = inspect.signature(component)
+    parameters = list(signature.parameters.values())
+    for parameter in parameters:
+        if parameter.kind not in _SUPPORTED_KINDS:
+            raise TypeError(f"Cannot compile components taking *{parameter.name}")
+
+    # Positional-only parameters cannot be given by name
+    positional = [
+        parameter
+        for parameter in parameters
+        if parameter.kind == inspect.Parameter.POSITIONAL_ONLY
+    ]
+    traced = component(
+        *[_marker(i) for i in range(len(positional))],
+        **{
+            parameter.name: _marker(i)
+            for i, parameter in enumerate(parameters)
+            if parameter.kind != inspect.Parameter.POSITIONAL_ONLY
+        },
+    )
+    ops = _merge(_trace(traced))
+
+    namespace: dict[str, Any] = {
+        "_component": component,
+        "_minified": minify.is_enabled,
+        "_get_escaper": escaping.get_escaper,
+        "_node": _render_node,
+        "_prop": _format_prop_value,
+        "_str": builtins.str,
+        "_Markup": escaping.Markup,
+    }
+    expressions = []
+    for op in ops:
+        if isinstance(op, str):
+            name = f"_s{len(namespace)}"
+            namespace[name] = op
+            expressions.append(name)
+            continue
+
+        arg = parameters[op.index].name
+        if op.kind == "node":
+            expressions.append(f"_node({arg}, {op.safe})")
+        elif op.kind == "prop":
+            expressions.append(f"_prop({arg}, _esc)")
+        elif op.safe:
+            expressions.append(f"_str({arg})")
+        else:
+            expressions.append(f"_esc(_str({arg}))")
+
+    params = []
+    for i, parameter in enumerate(parameters):
+        if parameter.kind == inspect.Parameter.KEYWORD_ONLY and "*" not in params:
+            params.append("*")
+
+        param = parameter.name
+        if parameter.default is not inspect.Parameter.empty:
+            namespace[f"_d{i}"] = parameter.default
+            param += f"=_d{i}"
+        params.append(param)
+
+        if parameter.kind == inspect.Parameter.POSITIONAL_ONLY and (
+            i + 1 == len(parameters)
+            or parameters[i + 1].kind != inspect.Parameter.POSITIONAL_ONLY
+        ):
+            params.append("/")
+
+    call = [p.name for p in positional] + [
+        f"{p.name}={p.name}" for p in parameters if p not in positional
+    ]
+    source = "\n".join(
+        [
+            f"def _compiled({', '.join(params)}):",
+            # The template is not minified, minified HTML is rendered from the component
+            "    if _minified():",
+            f"        return _Markup(_node(_component({', '.join(call)}), False))",
+            "    _esc = _get_escaper()",
+            f"    return _Markup(''.join(({''.join(e + ', ' for e in expressions)})))",
+        ]
+    )
+    exec(
+        builtins.compile(source, f"<liku.compile {component.__qualname__}>", "exec"),
+        namespace,
+    )
+
+    compiled = namespace["_compiled"]
+    functools.update_wrapper(compiled, component)
+    compiled.__liku_source__ = source
+    return compiled
@@ -1,8 +1,23 @@
-from contextvars import ContextVar, copy_context
+from contextvars import Context as _Snapshot, ContextVar, copy_context
 from contextlib import contextmanager
 from typing import Callable, overload
 
-from liku.elements import HTMLNode
+from liku.elements import Fragment, HTMLNode
+
+
+class Provided(Fragment):
+    """Children built by `Context.Provider`, with a snapshot of the context they were
+    built in. Awaitables among them are run under it by `liku.aio`."""
+
+    __slots__ = ("context",)
+
+    def __init__(self, context: _Snapshot, children: HTMLNode = None):
+        super().__init__(children=children)
+        self.context = context
+
+    def __reduce__(self):
+        # Contexts cannot be pickled, only the children are kept
+        return (Fragment, (None, self.children))
 
 
 class Context[T]:
@@ -53,9 +68,17 @@ class Context[T]:
                 "Cannot get value of given context, perhaps you forgot to call .provide() or wrap it inside with statement?"
             ) from e
 
-    def Provider(self, value: T, children: Callable[[], HTMLNode]):
-        with self.provide(value):
-            return children()
+    def Provider(self, value: T, children: Callable[[], HTMLNode]) -> Provided:
+        """Builds the children with the value provided.
+
+        Anything rendered later, such as lazy children or awaitables, still sees the value.
+        """
+        # Set directly rather than with `provide()`, so deep nesting stays cheap
+        token = self.context.set(value)
+        try:
+            return Provided(copy_context(), children())
+        finally:
+            self.context.reset(token)
 
 
 def use_context[T](context: Context[T]) -> T:
@@ -0,0 +1,108 @@
+"""Compares two trees to only send what changed, as htmx out-of-band swaps.
+
+Changes are swapped at the closest element with an `id` enclosing them. Children of an element are
+matched by their `key` prop, or by their `id` prop, when they have one, and by position otherwise.
+The `key` prop is never rendered.
+"""
+
+from typing import Any
+
+from liku.elements import HTMLElement, HTMLNode, _as_children
+
+
+def _key(node: Any) -> Any:
+    if isinstance(node, HTMLElement):
+        return node.props.get("key", node.props.get("id"))
+    return None
+
+
+def _children(node: "HTMLNode | None") -> list[Any]:
+    return [child for child in _as_children(node) if child is not None]
+
+
+def _same_shape(old: HTMLElement, new: HTMLElement) -> bool:
+    return (
+        old.__class__ is new.__class__
+        and old.safe == new.safe
+        and dict(old.props) == dict(new.props)
+    )
+
+
+def _diff(old: Any, new: Any) -> list[HTMLElement] | None:
+    """Returns the swaps turning `old` into `new`, or None when `new` must replace `old`."""
+    if isinstance(old, str) or isinstance(new, str):
+        return [] if old == new else None
+
+    if not (isinstance(old, HTMLElement) and isinstance(new, HTMLElement)):
+        raise TypeError(f"Cannot diff {old!r} and {new!r}")
+
+    if old.__class__._opaque or new.__class__._opaque:
+        return [] if old.render() == new.render() else None
+
+    if not _same_shape(old, new):
+        return None
+
+    return _diff_children(_children(old.children), _children(new.children))
+
+
+def _diff_children(old_children: list[Any], new_children: list[Any]) -> list | None:
+    if len(old_children) != len(new_children):
+        return None
+
+    # Keyed children must keep their order, so children are matched by position, and
+    # unkeyed ones are matched with the unkeyed child at the same position
+    if [_key(child) for child in old_children] != [
+        _key(child) for child in new_children
+    ]:
+        return None
+
+    swaps = []
+    for old_child, new_child in zip(old_children, new_children):
+        child_swaps = _diff(old_child, new_child)
+        if child_swaps is not None:
+            swaps.extend(child_swaps)
+        elif _swappable(old_child, new_child):
+            swaps.append(_out_of_band(new_child))
+        else:
+            return None
+    return swaps
+
+
+def _swappable(old: Any, new: Any) -> bool:
+    if not (isinstance(old, HTMLElement) and isinstance(new, HTMLElement)):
+        return False
+    if new.__class__._opaque or new.__class__.tag_name is None:
+        return False
+    element_id = new.props.get("id")
+    return element_id is not None and old.props.get("id") == element_id
+
+
+def _out_of_band(node: HTMLElement) -> HTMLElement:
+    return node.__class__(
+        props={**node.props, "hx-swap-oob": "true"},
+        children=node.children,
+        safe=node.safe,
+    )
+
+
+def diff(old: HTMLNode, new: HTMLNode) -> list[HTMLElement]:
+    """Finds the smallest subtrees of `new` that differ from `old`.
+
+    Each subtree is returned as a copy with `hx-swap-oob="true"`, so that rendering them in an htmx
+    response replaces the matching elements on the page. Both trees are walked, so children given as
+    iterators cannot be rendered again afterwards.
+
+    Args:
+        old (HTMLNode): Tree currently on the page.
+        new (HTMLNode): Updated tree.
+
+    Raises:
+        ValueError: If a change is not enclosed by any element with an `id`.
+
+    Returns:
+        list[HTMLElement]: Changed subtrees, empty if both trees are the same.
+    """
+    swaps = _diff_children(_children(old), _children(new))
+    if swaps is None:
+        raise ValueError("Changed elements must be enclosed by an element with an id")
+    return swaps
@@ -0,0 +1,408 @@
+"""Compact representation of large documents, as flat arrays instead of a Python object per node.
+
+A `Document` stores its tree as a sequence of opcodes, each followed by its operands in a
+second array. Tag and prop names are interned into tables and referred to by index, and
+every string lives in a single `str`, referred to by offset and length.
+"""
+
+from array import array
+import inspect
+from typing import Any
+
+from liku import escaping, minify
+from liku.elements import (
+    Fragment,
+    GenericComponent,
+    HTMLElement,
+    HTMLNode,
+    _as_children,
+    _cached_props,
+    _rebuild_static,
+)
+
+# Opcodes and their operands
+OPEN = 0  # tag, amount of props following
+OPEN_VOID = 1  # tag, amount of props following
+CLOSE = 2
+TEXT = 3  # offset, length
+RAW = 4  # offset, length, text that is not escaped
+STATIC = 5  # offset, length, HTML of a `Static`
+PROP_STR = 6  # name, offset, length
+PROP_INT = 7  # name, offset, length
+PROP_TRUE = 8  # name
+PROP_FALSE = 9  # name
+PROP_MARKUP = 10  # name, offset, length, value that is not escaped
+
+
+class DocumentBuilder:
+    """Builds a `Document`, from elements or from tags opened and closed one by one.
+
+    Elements appended are converted right away, so a large page can be built from many
+    small trees that are dropped as soon as they are appended:
+
+    ```py
+    builder = DocumentBuilder()
+    builder.open(e.ul, {"id": "posts"})
+    for post in posts:
+        builder.append(Card(post.title, post.body))
+    builder.close()
+    document = builder.build()
+    ```
+    """
+
+    def __init__(self):
+        self.ops = array("B")
+        self.args = array("I")
+        self.tags: list[str] = []
+        self.props: list[str] = []
+        self._tag_index: dict[str, int] = {}
+        self._prop_index: dict[str, int] = {}
+        self._strings: list[str] = []
+        self._string_index: dict[str, tuple[int, int]] = {}
+        self._size = 0
+        self._open: list[int] = []
+
+    def _intern(self, value: str, table: list[str], index: dict[str, int]) -> int:
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(table)
+            table.append(value)
+        return i
+
+    def _string(self, value: str) -> tuple[int, int]:
+        location = self._string_index.get(value)
+        if location is None:
+            location = self._string_index[value] = (self._size, len(value))
+            self._strings.append(value)
+            self._size += len(value)
+        return location
+
+    def _emit(self, op: int, *args: int):
+        self.ops.append(op)
+        self.args.extend(args)
+
+    def open(
+        self,
+        tag: str | type[HTMLElement],
+        props: dict[str, Any] | None = None,
+        void: bool | None = None,
+    ):
+        """Opens a tag, every node added until `close()` is one of its children.
+
+        Args:
+            tag (str | type[HTMLElement]): Tag name, or element class such as `liku.div`.
+            props (dict[str, Any] | None, optional): Props of the tag. Defaults to None.
+            void (bool | None, optional): Whether the tag is a void element, closed
+                right away. Defaults to None, guessed from the tag.
+
+        Raises:
+            TypeError: If the value of a prop is invalid.
+        """
+        if not isinstance(tag, str):
+            if void is None:
+                void = tag.void_element
+            if tag.tag_name is None:
+                raise TypeError(f"{tag.__name__} has no tag to open")
+            tag = tag.tag_name
+        elif void is None:
+            void = GenericComponent.create(tag).void_element
+
+        props = props or {}
+        self._emit(
+            OPEN_VOID if void else OPEN,
+            self._intern(tag, self.tags, self._tag_index),
+            len(props),
+        )
+        for key, value in props.items():
+            name = self._intern(key, self.props, self._prop_index)
+            if isinstance(value, bool):
+                self._emit(PROP_TRUE if value else PROP_FALSE, name)
+            elif isinstance(value, int):
+                self._emit(PROP_INT, name, *self._string(str(value)))
+            elif isinstance(value, str):
+                op = PROP_MARKUP if escaping.is_markup(value) else PROP_STR
+                self._emit(op, name, *self._string(value))
+            else:
+                raise TypeError("Unexpected type for value:", type(value))
+
+        if not void:
+            self._open.append(len(self.ops))
+
+    def close(self):
+        """Closes the last opened tag.
+
+        Raises:
+            ValueError: If there is no tag left to close.
+        """
+        if not self._open:
+            raise ValueError("No tag to close")
+        self._open.pop()
+        self._emit(CLOSE)
+
+    def text(self, value: str, safe: bool = False):
+        """Adds a text node, escaped unless `safe` or `Markup`."""
+        self._emit(
+            RAW if safe or escaping.is_markup(value) else TEXT, *self._string(value)
+        )
+
+    def append(self, node: HTMLNode):
+        """Adds a node and all of its children, without recursion.
+
+        Opaque elements, such as `Static`, are stored as their rendered HTML.
+
+        Raises:
+            TypeError: If the node has children that cannot be stored, such as awaitables.
+        """
+        stack: list[tuple[Any, bool, bool]] = []
+        children = iter(_as_children(node))
+        safe = False
+        closes = False
+
+        while True:
+            for child in children:
+                if isinstance(child, str):
+                    self.text(child, safe)
+                    continue
+
+                if child is None:
+                    continue
+
+                if not isinstance(child, HTMLElement) or inspect.isawaitable(child):
+                    raise TypeError(f"Cannot store {child!r} in a document")
+
+                cls = child.__class__
+                if cls._opaque:
+                    self._emit(STATIC, *self._string(child.render()))
+                    continue
+
+                if cls.tag_name is not None:
+                    self.open(cls, child.props)
+                    if cls.void_element:
+                        continue
+
+                stack.append((children, safe, closes))
+                children = iter(child.children)
+                safe = child.safe
+                closes = cls.tag_name is not None
+                break
+            else:
+                if closes:
+                    self.close()
+                if not stack:
+                    break
+                children, safe, closes = stack.pop()
+
+    def build(self) -> "Document":
+        """Creates the document, the builder can keep being used afterwards.
+
+        Raises:
+            ValueError: If some tags are still open.
+        """
+        if self._open:
+            raise ValueError(f"{len(self._open)} tags are not closed")
+        return Document(
+            array("B", self.ops),
+            array("I", self.args),
+            tuple(self.tags),
+            tuple(self.props),
+            "".join(self._strings),
+        )
+
+
+class Document(HTMLElement):
+    """Tree stored as flat arrays, see `DocumentBuilder`.
+
+    A document is an element, so it can be rendered or used as a child like any other.
+    """
+
+    __slots__ = ("ops", "args", "tags", "prop_names", "text")
+
+    ops: array
+    args: array
+    tags: tuple[str, ...]
+    prop_names: tuple[str, ...]
+    text: str
+
+    def __init__(
+        self,
+        ops: array,
+        args: array,
+        tags: tuple[str, ...],
+        prop_names: tuple[str, ...],
+        text: str,
+    ):
+        super().__init__(safe=True)
+        self.ops = ops
+        self.args = args
+        self.tags = tags
+        self.prop_names = prop_names
+        self.text = text
+
+    @classmethod
+    def from_element(cls, node: HTMLNode) -> "Document":
+        """Converts a tree of elements into a document."""
+        builder = DocumentBuilder()
+        builder.append(node)
+        return builder.build()
+
+    def render(self) -> str:
+        """Renders the document like the elements it was built from, without recursion."""
+        ops, args, text, prop_names = self.ops, self.args, self.text, self.prop_names
+        opening = ["<" + tag for tag in self.tags]
+        closing = [f"</{tag}>" for tag in self.tags]
+        escape = escaping.get_escaper()
+        minified = minify.is_enabled()
+        # Whether whitespace is kept in each open tag when minifying
+        preserved = [tag in minify.PRESERVE_WHITESPACE for tag in self.tags]
+
+        buffer: list[str] = []
+        append = buffer.append
+        stack: list[int] = []
+        preserving = 0
+        pos = 0
+        i = 0
+        n = len(ops)
+        while pos < n:
+            op = ops[pos]
+            pos += 1
+
+            if op == TEXT:
+                offset, length = args[i], args[i + 1]
+                i += 2
+                value = text[offset : offset + length]
+                if minified and not preserving:
+                    value = minify.collapse_whitespace(value)
+                append(escape(value))
+            elif op == RAW or op == STATIC:
+                offset, length = args[i], args[i + 1]
+                i += 2
+                append(text[offset : offset + length])
+            elif op == CLOSE:
+                tag = stack.pop()
+                append(closing[tag])
+                if minified and preserved[tag]:
+                    preserving -= 1
+            else:
+                # OPEN or OPEN_VOID, followed by its props
+                tag, amount = args[i], args[i + 1]
+                i += 2
+                items = []
+                for _ in range(amount):
+                    prop = ops[pos]
+                    pos += 1
+                    name = prop_names[args[i]]
+                    if prop == PROP_TRUE or prop == PROP_FALSE:
+                        items.append((name, prop == PROP_TRUE))
+                        i += 1
+                        continue
+
+                    value = text[args[i + 1] : args[i + 1] + args[i + 2]]
+                    items.append((name, _prop_value(prop, value)))
+                    i += 3
+
+                if items:
+                    props = _cached_props(tuple(items), minified)
+                    if props:
+                        append(f"{opening[tag]} {props}")
+                    else:
+                        append(opening[tag])
+                else:
+                    append(opening[tag])
+
+                if op == OPEN_VOID:
+                    append(">" if minified else " />")
+                    continue
+
+                append(">")
+                stack.append(tag)
+                if minified and preserved[tag]:
+                    preserving += 1
+
+        return "".join(buffer)
+
+    def to_element(self) -> HTMLElement:
+        """Converts the document back into elements.
+
+        Fragments are not stored in documents, their children are part of their parent.
+        """
+        ops, args, text, prop_names = self.ops, self.args, self.text, self.prop_names
+        root: list[Any] = []
+        children = root
+        stack: list[tuple[type[HTMLElement], dict[str, Any], list[Any]]] = []
+        pos = 0
+        i = 0
+        n = len(ops)
+        while pos < n:
+            op = ops[pos]
+            pos += 1
+
+            if op == TEXT or op == RAW or op == STATIC:
+                value = text[args[i] : args[i] + args[i + 1]]
+                i += 2
+                if op == TEXT:
+                    children.append(value)
+                elif op == RAW:
+                    children.append(Fragment(children=[value], safe=True))
+                else:
+                    children.append(_rebuild_static(value))
+            elif op == CLOSE:
+                cls, props, node_children = stack.pop()
+                children = stack[-1][2] if stack else root
+                children.append(_element(cls, props, node_children))
+            else:
+                tag, amount = args[i], args[i + 1]
+                i += 2
+                props: dict[str, Any] = {}
+                for _ in range(amount):
+                    prop = ops[pos]
+                    pos += 1
+                    name = prop_names[args[i]]
+                    if prop == PROP_TRUE or prop == PROP_FALSE:
+                        props[name] = prop == PROP_TRUE
+                        i += 1
+                        continue
+
+                    value = text[args[i + 1] : args[i + 1] + args[i + 2]]
+                    props[name] = _prop_value(prop, value)
+                    i += 3
+
+                cls = GenericComponent.create(self.tags[tag], op == OPEN_VOID)
+                if op == OPEN_VOID:
+                    children.append(cls(props))
+                    continue
+                stack.append((cls, props, []))
+                children = stack[-1][2]
+
+        if len(root) == 1 and isinstance(root[0], HTMLElement):
+            return root[0]
+        return Fragment(children=root)
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.ops, self.args, self.tags, self.prop_names, self.text),
+        )
+
+
+def _prop_value(op: int, value: str) -> str | int:
+    if op == PROP_INT:
+        return int(value)
+    if op == PROP_MARKUP:
+        return escaping.Markup(value)
+    return value
+
+
+def _element(
+    cls: type[HTMLElement], props: dict[str, Any], children: list[Any]
+) -> HTMLElement:
+    # Text that was not escaped is wrapped into safe fragments, unless it is all the
+    # element has
+    if children and all(
+        isinstance(child, Fragment)
+        and child.safe
+        and len(child.children) == 1
+        and isinstance(child.children[0], str)
+        for child in children
+    ):
+        return cls(props, [child.children[0] for child in children], safe=True)
+    return cls(props, children)
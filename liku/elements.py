@@ -1,8 +1,25 @@
-from abc import ABC, abstractmethod
-from collections.abc import Iterable
-import html as htmllib
-from typing import Any, Callable, Literal, TypedDict, overload, TypeAlias
+from abc import ABC
+import codecs
+from collections import OrderedDict
+from collections.abc import Generator, Iterable, Iterator
+from contextvars import Context, ContextVar, copy_context
+import functools
+import inspect
+import sys
+import threading
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    NamedTuple,
+    Protocol,
+    TypedDict,
+    is_typeddict,
+    overload,
+    TypeAlias,
+)
 
+from liku import escaping, minify, signatures
 from liku.signatures import (
     AnchorHTMLAttributes,
     AreaHTMLAttributes,
@@ -72,8 +89,98 @@ VOID_TAGS = [
     "wbr",
 ]
 
+
+class _LazyChildren:
+    """Children given as an iterable other than a list, such as a generator.
+
+    They are only consumed when the element is rendered, so a page built from a large
+    iterable can be streamed without ever holding all of its elements in memory. They
+    are consumed under a snapshot of the context they were given in, so components
+    built along the way see the same context values as if they were built eagerly.
+    """
+
+    __slots__ = ("iterable", "one_shot", "consumed", "context")
+
+    def __init__(self, iterable: Iterable[Any]):
+        self.iterable = iterable
+        self.one_shot = iter(iterable) is iterable
+        self.consumed = False
+        self.context = copy_context()
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.one_shot:
+            if self.consumed:
+                raise RuntimeError(
+                    "Children given as an iterator can only be rendered once"
+                )
+            self.consumed = True
+        # A copy, as the same children can be rendered by several threads at once
+        return _iter_in_context(self.context.copy(), iter(self.iterable))
+
+    def __reduce__(self):
+        # Contexts cannot be pickled, a snapshot is taken again where it is unpickled
+        return (self.__class__, (self.iterable,))
+
+
+def _iter_in_context(context: Context, iterator: Iterator[Any]) -> Iterator[Any]:
+    """Advances the iterator under the context, rather than whichever is current."""
+    run = context.run
+    while True:
+        try:
+            item = run(next, iterator)
+        except StopIteration:
+            return
+        yield item
+
+
+class SupportsWrite(Protocol):
+    def write(self, data: bytes | memoryview, /) -> Any: ...  # pragma: nocover
+
+
+class _FrozenDict(dict):
+    """Read-only dict, used to share props between elements."""
+
+    def _immutable(self, *args: Any, **kwargs: Any):
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable  # type: ignore
+    clear = pop = popitem = setdefault = update = _immutable  # type: ignore
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+
+# Shared by every element created without props or children
+_EMPTY_PROPS: dict[str, Any] = _FrozenDict()
+_EMPTY_CHILDREN: tuple = ()
+
+# Chunks are joined at the end anyway, this only bounds how much is encoded at once
+_RENDER_BYTES_CHUNK = 1 << 16
+
+# Amount of buffered pieces after which `render_stream()` hands them over for chunking.
+_STREAM_FLUSH_PIECES = 32
+
+
 class HTMLElement[PropsType: TypedDict](ABC):
-    """Representation of a HTML element."""
+    """Representation of a HTML element.
+
+    Subclasses that override `render()` are treated as opaque by the renderer, their
+    `render()` output is emitted as-is in place of the element.
+    """
+
+    __slots__ = ("props", "children", "safe")
+
+    tag_name: str | None = None
+    void_element: bool = False
+    _opening_tag: str = ""
+    _closing_tag: str = ""
+    _opaque: bool = False
+    # Checked before the slower `isinstance()` of an ABC
+    _is_element: bool = True
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._opaque = cls.render is not HTMLElement.render
 
     def __init__(
         self,
@@ -82,58 +189,172 @@ class HTMLElement[PropsType: TypedDict](ABC):
         safe: bool = False,
     ):
         if not props:
-            props = {}
+            props = _EMPTY_PROPS
         if not children:
-            children = []
-
-        if not isinstance(children, list):
-            children = [children]
+            children = _EMPTY_CHILDREN
+        elif not isinstance(children, list):
+            children = _wrap_children(children)
 
         self.props = props
         self.children = children
         self.safe = safe
 
-    @abstractmethod
     def render(self) -> str:
-        raise NotImplementedError  # pragma: nocover
+        """Renders the element and all of its children into HTML."""
+        return "".join(_render_chunks((self,), False, sys.maxsize))
+
+    def iter_render(self) -> Iterator[str]:
+        """Renders the element lazily, yielding pieces of HTML as soon as they are ready.
+
+        Elements that only implement `render()` are yielded as a single piece.
+
+        Yields:
+            str: Rendered pieces of HTML, in document order.
+        """
+        return _render_chunks((self,), False, 1)
+
+    def render_stream(self, chunk_size: int = 4096) -> Iterator[str]:
+        """Renders the element lazily, grouping pieces into ready-to-send chunks.
+
+        Args:
+            chunk_size (int, optional): Minimum length of each chunk, except the last one. Defaults to 4096.
+
+        Yields:
+            str: Chunks of rendered HTML, in document order.
+        """
+        # Rendered under the context of the call, not of whoever consumes the chunks
+        return _iter_in_context(copy_context(), self._render_stream(chunk_size))
+
+    def _render_stream(self, chunk_size: int) -> Iterator[str]:
+        buffer: list[str] = []
+        size = 0
+        for piece in _render_chunks((self,), False, _STREAM_FLUSH_PIECES):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+
+        if buffer:
+            yield "".join(buffer)
+
+    def iter_render_bytes(
+        self, chunk_size: int = 4096, encoding: str = "utf-8"
+    ) -> Iterator[bytes | memoryview]:
+        """Renders the element lazily into encoded chunks, see `render_stream()`.
+
+        Chunks are encoded as they are produced, and HTML cached as bytes by frozen
+        elements is yielded as-is, without encoding it again.
 
-    def format_props(self):
+        Args:
+            chunk_size (int, optional): Minimum length of each chunk, in characters, except
+                the last one and the ones before cached bytes. Defaults to 4096.
+            encoding (str, optional): Encoding of the chunks. Defaults to "utf-8".
+
+        Yields:
+            bytes | memoryview: Encoded chunks of rendered HTML, in document order.
+        """
+        return _iter_in_context(
+            copy_context(), self._iter_render_bytes(chunk_size, encoding)
+        )
+
+    def _iter_render_bytes(
+        self, chunk_size: int, encoding: str
+    ) -> Iterator[bytes | memoryview]:
+        # One encoder for the whole stream, so stateful codecs such as UTF-16 only
+        # write their BOM once
+        encode = codecs.getincrementalencoder(encoding)().encode
+        buffer: list[str] = []
+        size = 0
+        for piece in _render_chunks(
+            (self,), False, _STREAM_FLUSH_PIECES, encoding=encoding
+        ):
+            if isinstance(piece, str):
+                buffer.append(piece)
+                size += len(piece)
+                if size >= chunk_size:
+                    yield encode("".join(buffer))
+                    buffer.clear()
+                    size = 0
+                continue
+
+            if buffer:
+                yield encode("".join(buffer))
+                buffer.clear()
+                size = 0
+            yield piece
+
+        tail = encode("".join(buffer), True)
+        if tail:
+            yield tail
+
+    def render_bytes(self, encoding: str = "utf-8") -> bytes:
+        """Renders the element into encoded HTML, without building it as a string first.
+
+        Args:
+            encoding (str, optional): Encoding of the HTML. Defaults to "utf-8".
+
+        Returns:
+            bytes: Rendered HTML.
+        """
+        return b"".join(self.iter_render_bytes(_RENDER_BYTES_CHUNK, encoding))
+
+    def render_into(
+        self,
+        writer: SupportsWrite,
+        chunk_size: int = 4096,
+        encoding: str = "utf-8",
+    ) -> int:
+        """Renders the element into anything with a `write()` method taking bytes.
+
+        For instance `io.BytesIO`, a socket file, or Django's `HttpResponse`. Chunks are
+        written as soon as they are ready, see `iter_render_bytes()`.
+
+        Args:
+            writer (SupportsWrite): Where to write the encoded HTML.
+            chunk_size (int, optional): Minimum length of each write, in characters.
+                Defaults to 4096.
+            encoding (str, optional): Encoding of the HTML. Defaults to "utf-8".
+
+        Returns:
+            int: Amount of bytes written.
+        """
+        written = 0
+        for chunk in self.iter_render_bytes(chunk_size, encoding):
+            writer.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _encoded(self, encoding: str) -> bytes | memoryview | None:
+        """HTML of an opaque element cached as bytes, if there is any."""
+        return None
+
+    def format_props(self, minified: bool = False):
         """Formats all props into html representation of them.
 
+        Formatted props are cached, so elements sharing the same props only format them once.
+
+        Args:
+            minified (bool, optional): Whether boolean attributes are written in their
+                minimal form and quotes are left out where possible, see `liku.minify`.
+                Defaults to False.
+
         Raises:
             TypeError: If the value of a prop is invalid.
 
         Returns:
             str: Formatted props to be used in HTML.
         """
-        props = []
-        for k, v in self.props.items():
-            if isinstance(v, bool):
-                v = str(v).lower()
-            elif isinstance(v, int):
-                v = str(v)
-
-            if not isinstance(v, str):
-                raise TypeError("Unexpected type for value:", type(v))
-
-            v = htmllib.escape(v)
-            if k.endswith("_"):
-                k = k[:-1]
-            props.append(f'{k}="{v}"')
-        return " ".join(props)
+        return _cached_props(tuple(self.props.items()), minified)
 
     def render_child(self):
         """Renders all children of the element."""
+        return "".join(_render_chunks(self.children, self.safe, sys.maxsize))
 
-        def _render(child: HTMLElement | str):
-            if isinstance(child, HTMLElement):
-                return child.render()
-
-            if self.safe:
-                return child
-            return htmllib.escape(child)
-
-        return "".join([_render(elem) for elem in self.children if elem is not None])
+    def iter_render_child(self) -> Iterator[str]:
+        """Renders all children of the element lazily, see `iter_render()`."""
+        return _render_chunks(self.children, self.safe, 1)
 
     def __str__(self):
         return self.render()
@@ -142,9 +363,458 @@ class HTMLElement[PropsType: TypedDict](ABC):
         return self.__str__()  # pragma: nocover
 
 
+def _build_prop_keys() -> dict[str, str]:
+    """Collects every props key from the typed signatures that differs from its HTML name."""
+    keys = {}
+    for obj in vars(signatures).values():
+        if not is_typeddict(obj):
+            continue
+
+        for k in obj.__annotations__:
+            if k.endswith("_"):
+                keys[k] = k[:-1]
+    return keys
+
+
+# Props keys that conflict with Python keywords, mapped into their HTML name
+_PROP_KEYS = _build_prop_keys()
+
+# Formatted props, keyed by their items and whether they are minified. Like the `re`
+# module, the whole cache is dropped once it is full.
+_props_cache: dict[tuple[tuple[tuple[str, Any], ...], bool], str] = {}
+_PROPS_CACHE_SIZE = 4096
+
+
+def _format_prop_key(k: str) -> str:
+    return _PROP_KEYS.get(k) or (k[:-1] if k.endswith("_") else k)
+
+
+def _format_prop_value(v: Any, escape: escaping.Escaper) -> str:
+    if isinstance(v, bool):
+        v = str(v).lower()
+    elif isinstance(v, int):
+        v = str(v)
+
+    if not isinstance(v, str):
+        raise TypeError("Unexpected type for value:", type(v))
+    if v.__class__ is not str and escaping.is_markup(v):
+        return v
+    return escape(v)
+
+
+def _cached_props(items: tuple[tuple[str, Any], ...], minified: bool = False) -> str:
+    """Formats props through the cache, which only holds props made of plain strings."""
+    for _, v in items:
+        # Markup("a") == "a", so it would find the escaped string in the cache
+        if v.__class__ is not str:
+            return _format_props(items, minified)
+    try:
+        return _props_cache[items, minified]
+    except KeyError:
+        return _format_props(items, minified)
+
+
+def _format_props(items: tuple[tuple[str, Any], ...], minified: bool = False) -> str:
+    escape = escaping.get_escaper()
+    props = []
+    # True == 1 and Markup("a") == "a", so only props made of plain strings are safe
+    # to cache
+    cacheable = True
+    for k, v in items:
+        if v.__class__ is not str:
+            cacheable = False
+        if k == "key":
+            # Only identifies the element, see `liku.diff`
+            continue
+
+        key = _format_prop_key(k)
+        if not minified:
+            props.append(f'{key}="{_format_prop_value(v, escape)}"')
+            continue
+
+        if isinstance(v, bool) and key in minify.BOOLEAN_ATTRIBUTES:
+            if v:
+                props.append(key)
+            continue
+
+        value = _format_prop_value(v, escape)
+        if minify.can_unquote(value):
+            props.append(f"{key}={value}")
+        else:
+            props.append(f'{key}="{value}"')
+
+    formatted = " ".join(props)
+    if cacheable:
+        if len(_props_cache) >= _PROPS_CACHE_SIZE:
+            _props_cache.clear()
+        _props_cache[items, minified] = formatted
+    return formatted
+
+
+# Profiler of the current render, see `liku.profiler`
+_active_profiler: ContextVar[Any] = ContextVar("liku_profiler", default=None)
+
+_PRESERVED_CLOSING_TAGS = frozenset(
+    f"</{tag}>" for tag in minify.PRESERVE_WHITESPACE
+)
+
+
+class _SplitRequest(NamedTuple):
+    children: list["HTMLElement | str | None"]
+    safe: bool
+    # Minify state where the children are, to render them the same way elsewhere
+    minified: bool = False
+    preserved: int = 0
+
+
+def _wrap_children(node: Any) -> "list[Any] | _LazyChildren":
+    if (
+        getattr(node.__class__, "_is_element", False)
+        or isinstance(node, (str, HTMLElement))
+        or not isinstance(node, Iterable)
+        or inspect.isawaitable(node)
+    ):
+        return [node]
+    return _LazyChildren(node)
+
+
+def _as_children(node: "HTMLNode | None") -> Iterable["HTMLElement | str | None"]:
+    if node is None:
+        return _EMPTY_CHILDREN
+    if isinstance(node, list):
+        return node
+    return _wrap_children(node)
+
+
+def _render_chunks(
+    nodes: Iterable["HTMLElement | str | None"],
+    safe: bool,
+    flush_every: int,
+    resolve: bool = False,
+    split_at: int | None = None,
+    encoding: str | None = None,
+    minified: bool | None = None,
+    preserved: int = 0,
+) -> Generator[Any, Any, None]:
+    """Renders nodes without recursion, appending everything into a single buffer.
+
+    Instead of every element rendering its own children, the tree is walked with an
+    explicit stack of children iterators, so the depth of the tree is not bound by the
+    recursion limit and no intermediate strings are built per element.
+
+    Args:
+        nodes (Iterable[HTMLElement | str | None]): Nodes to render.
+        safe (bool): Whether text nodes in `nodes` are safe from escaping.
+        flush_every (int): Amount of buffered pieces at which the buffer is joined and
+            yielded, checked at every tag boundary.
+        resolve (bool, optional): Whether awaitables are yielded to be resolved by the
+            caller, which sends their result back. Otherwise, rendering an awaitable
+            raises a TypeError. Defaults to False.
+        split_at (int | None, optional): Amount of children at which an element yields a
+            `_SplitRequest` for its children, for the caller to render them and send back
+            the rendered HTML pieces. Defaults to None, never splitting.
+        encoding (str | None, optional): Encoding the caller writes in. When given,
+            opaque elements that have their HTML cached as bytes, such as `Static`, yield
+            those bytes as-is. Defaults to None.
+        minified (bool | None, optional): Whether the HTML is minified. Defaults to None,
+            whether minifying is enabled, see `liku.minify`.
+        preserved (int, optional): Depth inside elements whose whitespace is kept when
+            minifying, for nodes that are children of such elements. Defaults to 0.
+
+    Yields:
+        str | bytes | memoryview | Awaitable | _SplitRequest: Joined pieces of rendered
+        HTML, pre-encoded HTML, or requests for the caller.
+    """
+    escape = escaping.get_escaper()
+    if minified is None:
+        minified = minify.is_enabled()
+    buffer: list[str] = []
+    append = buffer.append
+    # Only looked up once, so rendering costs nothing more when not profiling
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        escape = profiler.timed_escape(escape)
+        append = profiler.counted_append(append)
+    stack: list[tuple[Iterator, bool, str]] = []
+    children = iter(nodes)
+    closing_tag = ""
+
+    while True:
+        for child in children:
+            if isinstance(child, str):
+                if safe or (child.__class__ is not str and escaping.is_markup(child)):
+                    append(child)
+                elif minified and not preserved:
+                    append(escape(minify.collapse_whitespace(child)))
+                else:
+                    append(escape(child))
+                continue
+
+            if child is None:
+                continue
+
+            if not isinstance(child, HTMLElement):
+                if not inspect.isawaitable(child):
+                    append(child if safe else escape(child))
+                    continue
+
+                if not resolve:
+                    raise TypeError(
+                        f"Cannot render {child!r} synchronously, use render_async() instead"
+                    )
+
+                if buffer:
+                    yield "".join(buffer)
+                    buffer.clear()
+
+                resolved = yield child
+                stack.append((children, safe, closing_tag))
+                children = iter(_as_children(resolved))
+                closing_tag = ""
+                break
+
+            cls = child.__class__
+            if profiler is not None:
+                profiler.enter(child, len(stack) + 1)
+
+            if cls._opaque:
+                encoded = None
+                if encoding is not None:
+                    encoded = child._encoded(encoding)
+
+                if encoded is not None:
+                    if buffer:
+                        yield "".join(buffer)
+                        buffer.clear()
+                    yield encoded
+                else:
+                    append(child.render())
+
+                if profiler is not None:
+                    profiler.exit(len(stack) + 1, encoded)
+                continue
+
+            if cls.tag_name is not None:
+                if not child.props:
+                    append(cls._opening_tag)
+                elif props := child.format_props(minified):
+                    append(f"{cls._opening_tag} {props}")
+                else:
+                    # Every prop was a `key`, or a false boolean attribute
+                    append(cls._opening_tag)
+
+                if cls.void_element:
+                    append(">" if minified else " />")
+                    if profiler is not None:
+                        profiler.exit(len(stack) + 1)
+                    continue
+                append(">")
+
+                if minified and cls.tag_name in minify.PRESERVE_WHITESPACE:
+                    preserved += 1
+
+            stack.append((children, safe, closing_tag))
+            closing_tag = cls._closing_tag
+            children = child.children
+            if split_at is not None and isinstance(children, _LazyChildren):
+                # Read to find how many there are, they are held in memory once split
+                children = list(children)
+            if (
+                split_at is not None
+                and isinstance(children, list)
+                and len(children) >= split_at
+            ):
+                if buffer:
+                    yield "".join(buffer)
+                    buffer.clear()
+
+                # Rendered elsewhere, the caller sends back the rendered HTML
+                children = iter(
+                    (yield _SplitRequest(children, child.safe, minified, preserved))
+                )
+                safe = True
+            else:
+                children = iter(children)
+                safe = child.safe
+
+            if len(buffer) >= flush_every:
+                yield "".join(buffer)
+                buffer.clear()
+            break
+        else:
+            append(closing_tag)
+            if preserved and closing_tag in _PRESERVED_CLOSING_TAGS:
+                preserved -= 1
+            if profiler is not None:
+                profiler.exit(len(stack))
+            if not stack:
+                break
+
+            children, safe, closing_tag = stack.pop()
+            if len(buffer) >= flush_every:
+                yield "".join(buffer)
+                buffer.clear()
+
+    if buffer:
+        yield "".join(buffer)
+
+
 class Fragment[PropsType: TypedDict](HTMLElement[PropsType]):
-    def render(self):
-        return self.render_child()
+    __slots__ = ()
+
+
+class FrozenElementError(AttributeError):
+    """Raised when trying to modify a frozen element."""
+
+
+class Static(HTMLElement):
+    """Immutable element that is rendered once, its HTML is cached and emitted as-is.
+
+    Use `freeze()` or `static()` to create one.
+    """
+
+    __slots__ = ("html", "_utf8")
+
+    html: str
+
+    def __init__(self, node: "HTMLNode"):
+        if not isinstance(node, HTMLElement):
+            node = Fragment(children=node)
+
+        object.__setattr__(self, "html", node.render())
+        object.__setattr__(self, "_utf8", None)
+        object.__setattr__(self, "props", _EMPTY_PROPS)
+        object.__setattr__(self, "children", _EMPTY_CHILDREN)
+        object.__setattr__(self, "safe", True)
+
+    def render(self) -> str:
+        return self.html
+
+    def _encoded(self, encoding: str) -> memoryview | None:
+        # Only UTF-8 is cached: it keeps no state between chunks, unlike codecs such as
+        # UTF-16 whose BOM must only be written once per stream
+        if encoding.replace("_", "-").lower() not in ("utf-8", "utf8"):
+            return None
+
+        if self._utf8 is None:
+            object.__setattr__(self, "_utf8", memoryview(self.html.encode()))
+        return self._utf8  # type: ignore
+
+    def __setattr__(self, name: str, value: Any):
+        raise FrozenElementError(f"Cannot set {name!r}, frozen elements are immutable")
+
+    def __delattr__(self, name: str):
+        raise FrozenElementError(
+            f"Cannot delete {name!r}, frozen elements are immutable"
+        )
+
+    def __reduce__(self):
+        return (_rebuild_static, (self.html,))
+
+
+def _rebuild_static(html: str) -> Static:
+    return Static(Fragment(children=html, safe=True))
+
+
+def freeze(node: "HTMLNode") -> Static:
+    """Renders the given node once, into an immutable element that emits the cached HTML.
+
+    Useful for parts of a page that never change between requests, such as the `<head>`
+    or navigation bars.
+
+    Args:
+        node (HTMLNode): Node to freeze.
+
+    Returns:
+        Static: The frozen element.
+    """
+    if isinstance(node, Static):
+        return node
+    return Static(node)
+
+
+def static[T: HTMLNode](component: Callable[[], T]) -> Callable[[], Static]:
+    """Decorator for components without arguments, building and freezing them only once.
+
+    Args:
+        component (Callable[[], HTMLNode]): The component to freeze.
+
+    Returns:
+        Callable[[], Static]: Component returning the same frozen element on every call.
+    """
+    frozen: Static | None = None
+
+    @functools.wraps(component)
+    def wrapper() -> Static:
+        nonlocal frozen
+        if frozen is None:
+            frozen = freeze(component())
+        return frozen
+
+    return wrapper
+
+
+class _ElementRegistry:
+    """Process-wide registry of generated element classes, keyed by tag name.
+
+    Classes registered before `pin()` is called (the ones liku exports) are kept forever,
+    classes for any other tag can be bounded with `maxsize`, evicting the least recently
+    used ones first.
+    """
+
+    def __init__(self):
+        self.pinned: dict[tuple[str, bool], type[HTMLElement]] = {}
+        self.custom: OrderedDict[tuple[str, bool], type[HTMLElement]] = OrderedDict()
+        self.maxsize: int | None = None
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple[str, bool]) -> type[HTMLElement] | None:
+        cls = self.pinned.get(key)
+        if cls is not None:
+            return cls
+
+        with self.lock:
+            cls = self.custom.get(key)
+            if cls is not None:
+                self.custom.move_to_end(key)
+            return cls
+
+    def add(self, key: tuple[str, bool], cls: type[HTMLElement]) -> type[HTMLElement]:
+        with self.lock:
+            # Another thread might have created the same class in the meantime
+            cls = self.custom.setdefault(key, cls)
+            self._evict()
+            return cls
+
+    def pin(self):
+        with self.lock:
+            self.pinned.update(self.custom)
+            self.custom.clear()
+
+    def resize(self, maxsize: int | None):
+        with self.lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+
+        while len(self.custom) > self.maxsize:
+            self.custom.popitem(last=False)
+
+
+_registry = _ElementRegistry()
+
+
+def _rebuild_element(
+    tag_name: str,
+    void_element: bool,
+    props: dict[str, str | int | bool],
+    children: "HTMLNode",
+    safe: bool,
+) -> HTMLElement:
+    return GenericComponent.create(tag_name, void_element)(props, children, safe)
 
 
 class GenericComponent[ElemPropsType: TypedDict]:
@@ -161,6 +831,9 @@ class GenericComponent[ElemPropsType: TypedDict]:
     ) -> type[HTMLElement[ElemPropsType]]:
         """Creates a class for the given tag name.
 
+        Classes are cached in a process-wide registry, so creating the same tag twice
+        returns the same class.
+
         Args:
             tag_name (str): The name of the tag.
 
@@ -171,24 +844,47 @@ class GenericComponent[ElemPropsType: TypedDict]:
         if void_element is None:
             void_element = tag_name.lower() in VOID_TAGS
 
+        key = (tag_name, void_element)
+        cls = _registry.get(key)
+        if cls is not None:
+            return cls
+
         class Element(HTMLElement):
-            def render(self):
-                opening_tag = "<" + tag_name
-                if len(self.props) != 0:
-                    opening_tag += " " + self.format_props()
+            __slots__ = ()
+
+            def __reduce__(self):
+                return (
+                    _rebuild_element,
+                    (tag_name, void_element, self.props, self.children, self.safe),
+                )
+
+        Element.tag_name = tag_name
+        Element.void_element = void_element
+        Element._opening_tag = "<" + tag_name
+        Element._closing_tag = f"</{tag_name}>"
+        Element.__name__ = tag_name
+        Element.__qualname__ = "GenericComponent." + tag_name
+        return _registry.add(key, Element)
 
-                if void_element:
-                    return f"{opening_tag} />"
+    @staticmethod
+    def set_registry_maxsize(maxsize: int | None):
+        """Bounds the amount of cached classes for tags that liku does not export.
 
-                opening_tag += ">"
-                return f"{opening_tag}{self.render_child()}</{tag_name}>"
+        Useful when tag names come from untrusted input, such as templates written by
+        users. Least recently used classes are evicted first.
 
-        Element.__name__ = tag_name
-        Element.__qualname__ = "GenericComponent." + tag_name
-        return Element
+        Args:
+            maxsize (int | None): Maximum amount of custom tag classes, or None for no limit.
+        """
+        _registry.resize(maxsize)
 
 
-HTMLNode: TypeAlias = list[HTMLElement | str | None] | HTMLElement | str
+HTMLNode: TypeAlias = (
+    list[HTMLElement | str | None]
+    | Iterable[HTMLElement | str | None]
+    | HTMLElement
+    | str
+)
 a = GenericComponent[AnchorHTMLAttributes].create("a")
 abbr = GenericComponent[HTMLAttributes].create("abbr")
 address = GenericComponent[HTMLAttributes].create("address")
@@ -302,6 +998,7 @@ var = GenericComponent[HTMLAttributes].create("var")
 video = GenericComponent[VideoHTMLAttributes].create("video")
 wbr = GenericComponent[HTMLAttributes].create("wbr", True)
 webview = GenericComponent[WebViewHTMLAttributes].create("webview")
+_registry.pin()
 
 
 @overload
@@ -1447,11 +2144,28 @@ def h[T: TypedDict](
     """
     return GenericComponent.create(tag_name)(props, children, safe)
 
+class _Mapped:
+    """Lazily maps a component over an iterable, every time it is iterated."""
+
+    __slots__ = ("component", "each")
+
+    def __init__(self, component: Callable[[Any], Any], each: Iterable):
+        self.component = component
+        self.each = each
+
+    def __iter__(self) -> Iterator[Any]:
+        component = self.component
+        return (component(item) for item in self.each)
+
+
 def For(each: Iterable, children: list[Any]):
+    # Over an iterator, the rows can only be rendered once, like any iterator children
+    one_shot = iter(each) is each
     results = []
     for child in children:
         if callable(child):
-            results.append(Fragment(children=list(map(child, each))))
+            mapped = _Mapped(child, each)
+            results.append(Fragment(children=iter(mapped) if one_shot else mapped))
         else:
             results.append(child)
     return Fragment(children=results)
@@ -0,0 +1,306 @@
+"""Helpers for sending rendered HTML over HTTP, independent of any web framework."""
+
+from collections.abc import Callable, Iterable, Iterator
+import hashlib
+from typing import NamedTuple, Protocol
+import zlib
+
+from liku.elements import HTMLElement
+
+try:
+    import brotli
+except ImportError:  # pragma: nocover
+    brotli = None
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...  # pragma: nocover
+
+    def flush(self) -> bytes: ...  # pragma: nocover
+
+
+# Supported content codings, in order of preference
+ENCODINGS = ("br", "gzip", "deflate") if brotli is not None else ("gzip", "deflate")
+
+DEFAULT_MIN_SIZE = 500
+DEFAULT_LEVELS = {"br": 5, "gzip": 6, "deflate": 6}
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        assert brotli is not None, "brotli is not installed"
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Picks the content coding to compress a response with, from `Accept-Encoding`.
+
+    Args:
+        accept_encoding (str | None): Value of the `Accept-Encoding` request header.
+
+    Returns:
+        str | None: Best supported coding accepted by the client, None to send the
+        response uncompressed.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best = None
+    best_weight = 0.0
+    for coding in ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compressor(encoding: str, level: int | None = None) -> Compressor:
+    """Creates an incremental compressor for a content coding.
+
+    Args:
+        encoding (str): One of `ENCODINGS`.
+        level (int | None, optional): Compression level, 0-9 for gzip and deflate, 0-11
+            for brotli. Defaults to `DEFAULT_LEVELS`.
+
+    Raises:
+        ValueError: If the coding is not supported.
+
+    Returns:
+        Compressor: Object with `compress()` and `flush()`, like `zlib.compressobj()`.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unsupported content coding: {encoding}")
+
+    if level is None:
+        level = DEFAULT_LEVELS[encoding]
+    if encoding == "br":
+        return _BrotliCompressor(level)
+    # gzip has a header and trailer, deflate is the zlib format
+    wbits = 31 if encoding == "gzip" else 15
+    return zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+
+def compress_chunks(
+    chunks: Iterable[bytes], encoding: str, level: int | None = None
+) -> Iterator[bytes]:
+    """Compresses chunks as they come, without joining them first.
+
+    Args:
+        chunks (Iterable[bytes]): Chunks to compress, such as `iter_render_bytes()`.
+        encoding (str): Content coding, see `compressor()`.
+        level (int | None, optional): Compression level, see `compressor()`.
+
+    Yields:
+        bytes: Compressed chunks, as soon as the compressor outputs them.
+    """
+    c = compressor(encoding, level)
+    for chunk in chunks:
+        if compressed := c.compress(chunk):
+            yield compressed
+    yield c.flush()
+
+
+class EncodedBody(NamedTuple):
+    # Bytes when buffered, compressed chunks as they are rendered otherwise
+    body: bytes | Iterator[bytes]
+    encoding: str | None
+    etag: str | None
+
+
+class PreparedResponse(NamedTuple):
+    status: int
+    body: bytes | Iterator[bytes]
+    headers: dict[str, str]
+
+
+def _hashed(chunks: Iterable[bytes], digest: "hashlib._Hash") -> Iterator[bytes]:
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def make_etag(digest: str, encoding: str | None = None) -> str:
+    """Builds a strong ETag, which differs for every content coding of the same body.
+
+    Args:
+        digest (str): Hash of the uncompressed body, or of a cache key.
+        encoding (str | None, optional): Content coding of the body. Defaults to None.
+
+    Returns:
+        str: Quoted ETag, as sent in the `ETag` header.
+    """
+    if encoding is not None:
+        return f'"{digest}-{encoding}"'
+    return f'"{digest}"'
+
+
+def key_etag(key: str, encoding: str | None = None) -> str:
+    """Builds the ETag of a response from a cache key, see `make_etag()`."""
+    return make_etag(
+        hashlib.blake2b(key.encode(), digest_size=16).hexdigest(), encoding
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks an ETag against the `If-None-Match` request header.
+
+    Args:
+        if_none_match (str | None): Value of the `If-None-Match` header.
+        etag (str): Quoted ETag of the response.
+
+    Returns:
+        bool: Whether the client already has the response.
+    """
+    if not if_none_match:
+        return False
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        # If-None-Match uses the weak comparison
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def encode_body(
+    node: HTMLElement,
+    encoding: str | None,
+    min_size: int = DEFAULT_MIN_SIZE,
+    level: int | None = None,
+    chunk_size: int = 1 << 14,
+    etag: bool = True,
+) -> EncodedBody:
+    """Renders an element into a response body, compressed while it is rendered.
+
+    The first `min_size` bytes are kept as-is, the body is only compressed once it is
+    known to be larger than that. Larger bodies are streamed: the body is an iterator
+    yielding compressed chunks as they are rendered. An ETag can only be computed once
+    the whole body is rendered, so with `etag` the body is buffered instead, and the
+    rendered chunks are hashed on the way.
+
+    Args:
+        node (HTMLElement): Element to render.
+        encoding (str | None): Content coding to use, see `negotiate_encoding()`.
+        min_size (int, optional): Smallest body, in bytes, worth compressing. Defaults
+            to `DEFAULT_MIN_SIZE`.
+        level (int | None, optional): Compression level, see `compressor()`.
+        chunk_size (int, optional): Size of the rendered chunks, in characters.
+        etag (bool, optional): Whether the ETag of the body is computed, which buffers
+            the body. Defaults to True.
+
+    Returns:
+        EncodedBody: Body, the coding it was compressed with if any, and its ETag.
+    """
+    chunks: Iterator[bytes] = node.iter_render_bytes(chunk_size)
+    digest = hashlib.blake2b(digest_size=16) if etag else None
+    if digest is not None:
+        chunks = _hashed(chunks, digest)
+
+    head: list[bytes] = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= min_size:
+            break
+    else:
+        # Small enough to be sent as-is
+        body = b"".join(head)
+        if digest is None:
+            return EncodedBody(body, None, None)
+        return EncodedBody(body, None, make_etag(digest.hexdigest()))
+
+    def rendered() -> Iterator[bytes]:
+        yield from head
+        yield from chunks
+
+    streamed = rendered()
+    if encoding is not None:
+        streamed = compress_chunks(streamed, encoding, level)
+    if digest is None:
+        return EncodedBody(streamed, encoding, None)
+
+    body = b"".join(streamed)
+    return EncodedBody(body, encoding, make_etag(digest.hexdigest(), encoding))
+
+
+def prepare_response(
+    node: HTMLElement | Callable[[], HTMLElement],
+    accept_encoding: str | None = None,
+    if_none_match: str | None = None,
+    cache_key: str | None = None,
+    compress: bool = True,
+    min_size: int = DEFAULT_MIN_SIZE,
+    level: int | None = None,
+) -> PreparedResponse:
+    """Renders an element into a compressed response with an ETag, for any web framework.
+
+    When `If-None-Match` holds the ETag of the response, it is `304 Not Modified`
+    without a body. Given a cache key, the ETag is derived from it instead of the body,
+    so a callable `node` is not even called when the client is up to date, and the
+    body is streamed, see `encode_body()`.
+
+    Args:
+        node (HTMLElement | Callable[[], HTMLElement]): Element to send, or a function
+            building it.
+        accept_encoding (str | None, optional): `Accept-Encoding` request header.
+        if_none_match (str | None, optional): `If-None-Match` request header.
+        cache_key (str | None, optional): Key that changes whenever the page does, such
+            as the last update time of what it shows. Defaults to None, hashing the body.
+        compress (bool, optional): Whether to compress the body. Defaults to True.
+        min_size (int, optional): Smallest body, in bytes, worth compressing.
+        level (int | None, optional): Compression level, see `compressor()`.
+
+    Returns:
+        PreparedResponse: Status code, body and headers to send.
+    """
+    encoding = negotiate_encoding(accept_encoding) if compress else None
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+    if compress:
+        headers["Vary"] = "Accept-Encoding"
+
+    etag = None
+    if cache_key is not None:
+        # Bodies smaller than min_size are sent uncompressed, under the other ETag
+        for etag in (key_etag(cache_key, encoding), key_etag(cache_key)):
+            if etag_matches(if_none_match, etag):
+                return PreparedResponse(304, b"", {**headers, "ETag": etag})
+        etag = key_etag(cache_key, encoding)
+
+    if not isinstance(node, HTMLElement):
+        node = node()
+    encoded = encode_body(node, encoding, min_size, level, etag=etag is None)
+    if encoded.encoding is not None:
+        headers["Content-Encoding"] = encoded.encoding
+    if etag is None:
+        # The body may have been too small to be compressed, which changes its ETag
+        etag = encoded.etag
+    elif encoded.encoding != encoding:
+        etag = key_etag(cache_key, encoded.encoding)
+    headers["ETag"] = etag
+
+    if etag_matches(if_none_match, etag):
+        if not isinstance(encoded.body, bytes):
+            encoded.body.close()  # type: ignore[attr-defined]
+        return PreparedResponse(304, b"", headers)
+    return PreparedResponse(200, encoded.body, headers)
@@ -1,6 +1,9 @@
 from functools import wraps
-from typing import Callable, Mapping, Sequence, Tuple, Union
-from flask import Response, make_response
+from typing import Callable, Mapping, NamedTuple, Sequence, Tuple, Union, overload
+from flask import Flask, Response, g, has_request_context, make_response, request
+from werkzeug.http import unquote_etag
+from liku import http
+from liku.profiler import Profiler
 from liku.elements import HTMLNode, HTMLElement
 
 
@@ -19,21 +22,193 @@ ResponseReturnValue = (
 RouteCallable = Callable[..., ResponseReturnValue]
 
 
-def component[
-    T: ResponseReturnValue, **P
-](f: Callable[P, T],) -> Callable[P, Response]:
-    """Converts view function to automatically convert Liku's HTML Elements to Flask's Response."""
+def _to_body(component: HTMLNode | Response) -> bytes | str | Response:
+    if isinstance(component, HTMLElement):
+        return component.render_bytes()
+    if isinstance(component, Response):
+        return component
+    return str(component)
 
-    @wraps(f)
-    def wrapper(*args: P.args, **kwargs: P.kwargs) -> Response:
-        result = f(*args, **kwargs)
 
-        if isinstance(result, HTMLElement):
-            return make_response(str(result))
-        if isinstance(result, Response):
-            return result
+class _Options(NamedTuple):
+    compress: bool
+    min_size: int
+    level: int | None
+    etag: bool
+    key: str = ""
 
-        component, *rest = result
-        return make_response(str(component), *rest)
 
-    return wrapper
+def _set_etag(response: Response, etag: str, vary: bool) -> Response:
+    if vary:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(unquote_etag(etag)[0])
+    # Sent as 304 Not Modified when If-None-Match holds the ETag. Without implicit
+    # sequence conversion, a streamed body is not read to compute its length
+    conversion = response.implicit_sequence_conversion
+    response.implicit_sequence_conversion = False
+    try:
+        response.make_conditional(request)
+    finally:
+        response.implicit_sequence_conversion = conversion
+    if response.status_code == 304:
+        # A streamed body is not rendered any further
+        if hasattr(response.response, "close"):
+            response.response.close()
+        response.set_data(b"")
+    return response
+
+
+def _respond(
+    component: HTMLNode | Response,
+    rest: list,
+    encoding: str | None,
+    options: _Options,
+    etag: str | None,
+) -> Response:
+    if not isinstance(component, HTMLElement):
+        return make_response(_to_body(component), *rest)
+
+    # Without an ETag, or with one from the cache key, the body is streamed
+    encoded = http.encode_body(
+        component,
+        encoding,
+        options.min_size,
+        options.level,
+        etag=options.etag and etag is None,
+    )
+    response = make_response(encoded.body, *rest)
+    if not has_request_context():
+        return response
+
+    if options.compress:
+        response.vary.add("Accept-Encoding")
+    if encoded.encoding is not None:
+        response.headers["Content-Encoding"] = encoded.encoding
+    if response.status_code != 200 or not options.etag:
+        return response
+
+    if etag is None:
+        etag = encoded.etag
+    elif encoded.encoding != encoding:
+        etag = http.key_etag(options.key, encoded.encoding)
+
+    assert etag is not None
+    return _set_etag(response, etag, options.compress)
+
+
+@overload
+def component[T: ResponseReturnValue, **P](
+    f: Callable[P, T],
+) -> Callable[P, Response]: ...  # pragma: nocover
+
+
+@overload
+def component[T: ResponseReturnValue, **P](
+    *,
+    compress: bool = True,
+    min_size: int = http.DEFAULT_MIN_SIZE,
+    level: int | None = None,
+    etag: bool = True,
+    cache_key: Callable[P, str | None] | None = None,
+) -> Callable[[Callable[P, T]], Callable[P, Response]]: ...  # pragma: nocover
+
+
+def component[T: ResponseReturnValue, **P](
+    f: Callable[P, T] | None = None,
+    *,
+    compress: bool = True,
+    min_size: int = http.DEFAULT_MIN_SIZE,
+    level: int | None = None,
+    etag: bool = True,
+    cache_key: Callable[P, str | None] | None = None,
+) -> Callable[P, Response] | Callable[[Callable[P, T]], Callable[P, Response]]:
+    """Converts view function to automatically convert Liku's HTML Elements to Flask's Response.
+
+    Elements are compressed while they are rendered, with the best coding accepted by the client
+    among brotli (if installed), gzip and deflate. Successful responses get a strong `ETag`, hashed
+    while rendering, and are sent as `304 Not Modified` when it matches `If-None-Match`. Can be used
+    as `@component`, or as `@component(...)` to configure it.
+
+    Args:
+        f (Callable[P, T] | None, optional): View function.
+        compress (bool, optional): Whether responses are compressed. Defaults to True.
+        min_size (int, optional): Smallest body, in bytes, worth compressing. Defaults to 500.
+        level (int | None, optional): Compression level, 0-9 for gzip and deflate, 0-11 for
+            brotli. Defaults to 5 for brotli and 6 otherwise.
+        etag (bool, optional): Whether responses get an ETag. Defaults to True.
+        cache_key (Callable[P, str | None] | None, optional): Called with the view arguments,
+            returns a key that changes whenever the page does. The ETag is derived from it, so
+            the view is not called at all when the client is up to date. Returning None falls
+            back to hashing the body. Defaults to None.
+    """
+
+    def decorator(f: Callable[P, T]) -> Callable[P, Response]:
+        @wraps(f)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> Response:
+            options = _Options(compress, min_size, level, etag)
+            encoding = None
+            key_tag = None
+            if has_request_context():
+                if compress:
+                    encoding = http.negotiate_encoding(
+                        request.headers.get("Accept-Encoding")
+                    )
+
+                key = None
+                if etag and cache_key is not None:
+                    key = cache_key(*args, **kwargs)
+
+                if key is not None:
+                    options = options._replace(key=key)
+                    key_tag = http.key_etag(key, encoding)
+
+                if key is not None and "If-None-Match" in request.headers:
+                    # Bodies smaller than min_size are sent uncompressed, under the other ETag
+                    for tag in (key_tag, http.key_etag(key)):
+                        response = _set_etag(make_response(b""), tag, compress)
+                        if response.status_code == 304:
+                            return response
+
+            result = f(*args, **kwargs)
+
+            if isinstance(result, Response):
+                return result
+            if isinstance(result, HTMLElement):
+                return _respond(result, [], encoding, options, key_tag)
+
+            component, *rest = result
+            return _respond(component, rest, encoding, options, key_tag)
+
+        return wrapper
+
+    if f is None:
+        return decorator
+    return decorator(f)
+
+
+def profile_requests(app: Flask, callback: Callable[[Profiler], None] | None = None):
+    """Profiles the components and tags of every request, see `liku.profiler`.
+
+    Only meant for development, as profiling makes every request slower.
+
+    Args:
+        app (Flask): Application to profile.
+        callback (Callable[[Profiler], None] | None, optional): Called with the profiler at the
+            end of each request. Defaults to None, logging its report.
+    """
+
+    @app.before_request
+    def start_profiler():
+        g._liku_profiler = Profiler().__enter__()
+
+    @app.teardown_request
+    def stop_profiler(exc: BaseException | None):
+        profiler = g.pop("_liku_profiler", None)
+        if profiler is None:
+            return
+
+        profiler.__exit__(None, None, None)
+        if callback is not None:
+            callback(profiler)
+        else:
+            app.logger.info("liku profile of %s\n%s", request.path, profiler.report())
@@ -0,0 +1,211 @@
+"""Layouts rendered once, with named slots filled on every request.
+
+The layout is rendered with a `Slot` marking where each part of a page goes. What is
+around the slots is cached as `Static` segments, which keep their HTML encoded as bytes:
+rendering a page only renders what fills the slots, and streams the cached segments
+around it as-is.
+"""
+
+from collections.abc import Callable
+import inspect
+import re
+import sys
+from typing import Any
+
+from liku import minify
+from liku.elements import (
+    Fragment,
+    HTMLElement,
+    HTMLNode,
+    Static,
+    _as_children,
+    _render_chunks,
+    freeze,
+)
+
+_SLOT = re.compile("\x00liku-slot:[0-9]+:[^\x00]*\x00")
+_SLOT_PARTS = re.compile("\x00liku-slot:([0-9]+):([^\x00]*)\x00")
+
+
+class Slot(HTMLElement):
+    """Placeholder for the part of a page named `name` in a `Shell`."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def render(self) -> str:
+        return f"\x00liku-slot:{id(self)}:{self.name}\x00"
+
+
+class _Preserved(HTMLElement):
+    """Content of a slot inside elements whose whitespace is kept when minifying."""
+
+    __slots__ = ("content", "depth")
+
+    def __init__(self, content: HTMLNode, safe: bool, depth: int):
+        super().__init__(safe=safe)
+        self.content = content
+        self.depth = depth
+
+    def render(self) -> str:
+        return "".join(
+            _render_chunks(
+                _as_children(self.content), self.safe, sys.maxsize, preserved=self.depth
+            )
+        )
+
+
+def _slot_parents(node: HTMLNode) -> dict[int, list[tuple[bool, int]]]:
+    """Finds how the parent of each slot renders it, in document order.
+
+    For each occurrence of a slot: whether its parent leaves text unescaped, and the
+    amount of enclosing elements whose whitespace is kept when minifying. Children given
+    as iterators are not walked, so they are not consumed.
+    """
+    parents: dict[int, list[tuple[bool, int]]] = {}
+    stack: list[tuple[Any, bool, int]] = [(node, False, 0)]
+    while stack:
+        node, safe, depth = stack.pop()
+        if isinstance(node, Slot):
+            parents.setdefault(id(node), []).append((safe, depth))
+        elif isinstance(node, (list, tuple)):
+            stack.extend((child, safe, depth) for child in reversed(node))
+        elif isinstance(node, HTMLElement) and not node.__class__._opaque:
+            if isinstance(node.children, (list, tuple)):
+                if node.__class__.tag_name in minify.PRESERVE_WHITESPACE:
+                    depth += 1
+                stack.extend(
+                    (child, node.safe, depth) for child in reversed(node.children)
+                )
+    return parents
+
+
+class Shell:
+    """Layout rendered once into static segments around its slots.
+
+    Calling it with what fills each slot gives an element rendering the whole page:
+
+    ```py
+    Layout = Shell(
+        e.html(
+            children=[
+                e.head(children=e.title(children=Slot("title"))),
+                e.body(children=e.div(props={"class_": "container"}, children=Slot("content"))),
+            ]
+        )
+    )
+
+    Layout(title="Home", content=Posts())
+    ```
+
+    Slots cannot be used in props, in children given as iterators or in frozen elements,
+    and a slot can be used more than once. Slot content is escaped and minified like it
+    would be in place of the slot.
+
+    Attributes:
+        segments (tuple[Static, ...]): HTML around the slots, one more than `slots`.
+        slots (tuple[str, ...]): Names of the slots, in order of appearance.
+    """
+
+    def __init__(self, node: HTMLNode):
+        parents = _slot_parents(node)
+        html = freeze(node).html
+        self.segments: tuple[Static, ...] = tuple(
+            freeze(Fragment(children=part, safe=True)) for part in _SLOT.split(html)
+        )
+
+        slots = []
+        # How each slot is rendered, to render its content the same way
+        self._parents: list[tuple[bool, int]] = []
+        for match in _SLOT_PARTS.finditer(html):
+            occurrences = parents.get(int(match.group(1)))
+            if not occurrences:
+                raise TypeError(
+                    "Slots cannot be in children given as iterators or in frozen elements"
+                )
+            slots.append(match.group(2))
+            self._parents.append(occurrences.pop(0))
+        self.slots: tuple[str, ...] = tuple(slots)
+        self._names = frozenset(self.slots)
+        # Set by `shell()`, to fill slots like the arguments of the component
+        self._positional: tuple[str, ...] = ()
+        self._defaults: dict[str, Any] = {}
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Fragment:
+        """Fills the slots of the layout.
+
+        Raises:
+            TypeError: If a slot is missing, or if an unknown slot is given.
+
+        Returns:
+            Fragment: The cached segments, with the content of each slot between them.
+        """
+        if args:
+            if len(args) > len(self._positional):
+                raise TypeError("Too many slots given as positional arguments")
+            positional = dict(zip(self._positional, args))
+            if positional.keys() & kwargs.keys():
+                raise TypeError("Slots given both as positional and keyword arguments")
+            kwargs.update(positional)
+        if self._defaults:
+            kwargs = {**self._defaults, **kwargs}
+
+        if not kwargs.keys() <= self._names:
+            unknown = kwargs.keys() - self._names
+            raise TypeError(f"Unknown slots: {', '.join(sorted(unknown))}")
+
+        segments = self.segments
+        parents = self._parents
+        children: list[Any] = [segments[0]]
+        for i, name in enumerate(self.slots, 1):
+            try:
+                content = kwargs[name]
+            except KeyError:
+                raise TypeError(f"Missing slot: {name}") from None
+
+            safe, depth = parents[i - 1]
+            if depth:
+                children.append(_Preserved(content, safe, depth))
+            elif isinstance(content, HTMLElement):
+                children.append(content)
+            else:
+                children.append(Fragment(children=content, safe=safe))
+            children.append(segments[i])
+        return Fragment(children=children)
+
+
+def shell(component: Callable[..., HTMLNode]) -> Shell:
+    """Decorator turning a layout component into a `Shell`, with a slot per argument.
+
+    The component is called once, with a `Slot` for each of its arguments. Arguments
+    with a default value are optional slots, filled with their default.
+
+    ```py
+    @shell
+    def Layout(content: e.HTMLNode, title: str = "My Blog"):
+        return e.html(children=[...])
+
+    Layout(Posts(), title="Home")
+    ```
+
+    Args:
+        component (Callable[..., HTMLNode]): Layout component.
+
+    Returns:
+        Shell: The pre-rendered layout, taking the same arguments as the component.
+    """
+    parameters = inspect.signature(component).parameters.values()
+    result = Shell(component(**{p.name: Slot(p.name) for p in parameters}))
+    result._positional = tuple(
+        p.name for p in parameters if p.kind != inspect.Parameter.KEYWORD_ONLY
+    )
+    result._defaults = {
+        p.name: p.default
+        for p in parameters
+        if p.default is not inspect.Parameter.empty
+    }
+    result.__doc__ = component.__doc__
+    return result
@@ -0,0 +1,167 @@
+from collections import OrderedDict
+import functools
+import threading
+import time
+from typing import Any, Callable, Hashable, NamedTuple, overload
+
+from liku.elements import HTMLNode, freeze
+
+
+class MemoInfo(NamedTuple):
+    """Statistics of a memoized component, similar to `functools.lru_cache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+
+
+_KWARGS_MARK = object()
+
+
+def _make_key(args: tuple, kwargs: dict[str, Any]) -> Hashable:
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK, *kwargs.items())
+    # Typed like `functools.lru_cache(typed=True)`, as 1 and True are equal but render
+    # differently
+    key += tuple(type(v) for v in args)
+    if kwargs:
+        key += tuple(type(v) for v in kwargs.values())
+    return key
+
+
+class Memoized[**P, T]:
+    """Component wrapped by `memo()`. Thread safe."""
+
+    def __init__(
+        self,
+        component: Callable[P, T],
+        maxsize: int | None,
+        ttl: float | None,
+        freeze: bool,
+    ):
+        self.component = component
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.freeze = freeze
+
+        self._cache: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        functools.update_wrapper(self, component)
+
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> T:
+        key = _make_key(args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable arguments, such as lists, can never be cached
+            with self._lock:
+                self._misses += 1
+            return self.component(*args, **kwargs)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+                del self._cache[key]
+                self._evictions += 1
+            self._misses += 1
+
+        value = self.component(*args, **kwargs)
+        if self.freeze:
+            value = freeze(value)  # type: ignore
+
+        if self.maxsize == 0:
+            return value
+
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._cache[key] = (value, expires_at)
+            self._cache.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+                    self._evictions += 1
+        return value
+
+    def invalidate(self, *args: P.args, **kwargs: P.kwargs) -> bool:
+        """Removes the cached result for the given arguments.
+
+        Returns:
+            bool: Whether there was a cached result to remove.
+        """
+        with self._lock:
+            return self._cache.pop(_make_key(args, kwargs), None) is not None
+
+    def cache_clear(self):
+        """Removes all cached results and resets the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def cache_info(self) -> MemoInfo:
+        """Gets the statistics of this component's cache."""
+        with self._lock:
+            return MemoInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.maxsize,
+                len(self._cache),
+            )
+
+
+@overload
+def memo[**P, T: HTMLNode](component: Callable[P, T]) -> Memoized[P, T]: ...  # pragma: nocover
+
+
+@overload
+def memo[**P, T: HTMLNode](
+    *,
+    maxsize: int | None = 128,
+    ttl: float | None = None,
+    freeze: bool = True,
+) -> Callable[[Callable[P, T]], Memoized[P, T]]: ...  # pragma: nocover
+
+
+def memo(
+    component: Callable | None = None,
+    *,
+    maxsize: int | None = 128,
+    ttl: float | None = None,
+    freeze: bool = True,
+):
+    """Decorator to cache the result of a component, keyed by its arguments.
+
+    Results are frozen by default, so the cached HTML is rendered only once and can be
+    shared safely between requests. Calls with unhashable arguments are never cached.
+
+    Args:
+        maxsize (int | None, optional): Maximum amount of cached results, least recently
+            used ones are evicted first. None for no limit. Defaults to 128.
+        ttl (float | None, optional): Seconds a cached result stays valid. None for no
+            expiry. Defaults to None.
+        freeze (bool, optional): Whether to cache the rendered HTML with `freeze()`
+            instead of the returned tree. Defaults to True.
+
+    Returns:
+        Memoized: The memoized component, with `cache_info()`, `cache_clear()` and
+        `invalidate()` methods.
+    """
+
+    def decorator(component: Callable) -> Memoized:
+        return Memoized(component, maxsize, ttl, freeze)
+
+    if component is not None:
+        return decorator(component)
+    return decorator
@@ -0,0 +1,77 @@
+"""Minified output, for production.
+
+When enabled, rendering collapses whitespace in text nodes, writes boolean attributes in their
+minimal form, leaves out quotes around props values that do not need them and closes void
+elements without a slash.
+"""
+
+import re
+
+# Attributes that are true when present, whatever their value
+# https://html.spec.whatwg.org/multipage/indices.html#attributes-3
+BOOLEAN_ATTRIBUTES = frozenset(
+    {
+        "allowfullscreen",
+        "async",
+        "autofocus",
+        "autoplay",
+        "checked",
+        "controls",
+        "default",
+        "defer",
+        "disabled",
+        "formnovalidate",
+        "hidden",
+        "inert",
+        "ismap",
+        "itemscope",
+        "loop",
+        "multiple",
+        "muted",
+        "nomodule",
+        "novalidate",
+        "open",
+        "playsinline",
+        "readonly",
+        "required",
+        "reversed",
+        "selected",
+        "shadowrootclonable",
+        "shadowrootdelegatesfocus",
+        "shadowrootserializable",
+    }
+)
+
+# Elements where whitespace is significant, or not text at all
+PRESERVE_WHITESPACE = frozenset({"pre", "textarea", "script", "style"})
+
+# Only ASCII whitespace is collapsed by browsers, a non-breaking space is kept
+_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+_UNQUOTED_VALUE = re.compile(r"[^ \t\n\r\f\"'=<>`]+")
+
+_enabled = False
+
+
+def set_minify(enabled: bool):
+    """Enables or disables minified output for every render.
+
+    Args:
+        enabled (bool): Whether rendered HTML is minified.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """Returns whether rendered HTML is minified."""
+    return _enabled
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapses every run of whitespace in a text node into a single space."""
+    return _WHITESPACE.sub(" ", text)
+
+
+def can_unquote(value: str) -> bool:
+    """Returns whether an escaped props value can be written without quotes."""
+    return _UNQUOTED_VALUE.fullmatch(value) is not None
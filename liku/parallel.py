@@ -0,0 +1,127 @@
+"""Rendering of large trees with a pool of workers.
+
+Elements with many children get their children split into chunks, which are rendered
+concurrently by the pool and stitched back in order. Everything else is rendered
+serially. A thread pool is used on free-threaded builds of Python, and a process pool
+otherwise, in which case the rendered chunks must be picklable.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+import math
+import os
+import sys
+import threading
+
+from liku.elements import (
+    HTMLElement,
+    HTMLNode,
+    _SplitRequest,
+    _active_profiler,
+    _as_children,
+    _render_chunks,
+)
+
+DEFAULT_THRESHOLD = 1000
+
+_default_executor: Executor | None = None
+_default_executor_lock = threading.Lock()
+
+
+def is_free_threaded() -> bool:
+    """Whether Python is running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def default_executor() -> Executor:
+    """Gets the pool shared by parallel renders without their own executor.
+
+    Created on first use, with threads on free-threaded builds and processes otherwise.
+    """
+    global _default_executor
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            if is_free_threaded():
+                _default_executor = ThreadPoolExecutor()
+            else:
+                _default_executor = ProcessPoolExecutor()
+        return _default_executor
+
+
+def _render_nodes(
+    nodes: list[HTMLElement | str | None], safe: bool, minified: bool, preserved: int
+) -> str:
+    return "".join(
+        _render_chunks(nodes, safe, sys.maxsize, minified=minified, preserved=preserved)
+    )
+
+
+def render_parallel(
+    node: HTMLNode,
+    threshold: int = DEFAULT_THRESHOLD,
+    chunk_size: int | None = None,
+    executor: Executor | None = None,
+) -> str:
+    """Renders the node into HTML, rendering large lists of children on a pool.
+
+    Gives the same HTML as `render()`. Children given as iterators are read into a list
+    to be split.
+
+    Args:
+        node (HTMLNode): Node to render.
+        threshold (int, optional): Amount of children from which an element's children
+            are rendered on the pool, below it they are rendered serially. Defaults to 1000.
+        chunk_size (int | None, optional): Amount of children rendered per task. Defaults
+            to splitting each list into 4 tasks per worker.
+        executor (Executor | None, optional): Pool to render on. Defaults to a shared pool,
+            see `default_executor()`.
+
+    Returns:
+        str: Rendered HTML.
+    """
+    if executor is None:
+        executor = default_executor()
+    workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+
+    if isinstance(executor, ProcessPoolExecutor):
+        submit = executor.submit
+    else:
+        # Threads render under the context of the caller, without its profiler, which
+        # only records its own thread
+        def submit(fn, *args):
+            context = copy_context()
+            context.run(_active_profiler.set, None)
+            return executor.submit(context.run, fn, *args)
+
+    buffer: list[str] = []
+    pieces = _render_chunks(_as_children(node), False, sys.maxsize, split_at=threshold)
+    value = None
+    while True:
+        try:
+            item = pieces.send(value)
+        except StopIteration:
+            break
+
+        value = None
+        if isinstance(item, str):
+            buffer.append(item)
+            continue
+
+        assert isinstance(item, _SplitRequest)
+        children = item.children
+        size = chunk_size or math.ceil(len(children) / (workers * 4))
+        futures = [
+            submit(
+                _render_nodes,
+                children[i : i + size],
+                item.safe,
+                item.minified,
+                item.preserved,
+            )
+            for i in range(0, len(children), size)
+        ]
+        value = [future.result() for future in futures]
+
+    return "".join(buffer)
@@ -0,0 +1,365 @@
+"""Opt-in profiler, to find which components and tags make a page slow.
+
+While a `Profiler` is active, every element created and rendered in the current context is
+measured. Component functions are found with `sys.monitoring`: any function returning an
+element is treated as one, and monitoring is turned off for every other function after its
+first call. A function that returns something else on its first call, such as a component
+returning None when there is nothing to show, is never counted afterwards. None of this is installed outside of a profiler, so rendering costs nothing more
+when it is not used.
+"""
+
+from collections.abc import Callable
+from contextvars import Token
+import inspect
+import json
+import os
+import sys
+import threading
+from time import perf_counter
+from types import CodeType
+from typing import Any
+
+from liku.elements import HTMLElement, _active_profiler
+
+_SORT_KEYS = ("render", "construct", "escape", "bytes", "nodes", "calls")
+_SKIPPED_FLAGS = (
+    inspect.CO_GENERATOR | inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR
+)
+
+# Ids of `sys.monitoring` tools tried, from the one set aside for profilers
+_TOOL_IDS = range(2, 6)
+_EVENTS = sys.monitoring.events
+_LIKU_DIR = os.path.dirname(__file__) + os.sep
+
+_patch_lock = threading.Lock()
+_patch_count = 0
+_tool_id = 0
+_original_init = HTMLElement.__init__
+# Code of functions that returned something else than an element
+_not_components: set[CodeType] = set()
+# Code of functions that returned an element, kept counted whatever they return next
+_components: set[CodeType] = set()
+
+
+def _skipped(code: CodeType) -> bool:
+    return (
+        code in _not_components
+        or bool(code.co_flags & _SKIPPED_FLAGS)
+        or code.co_filename.startswith(_LIKU_DIR)
+    )
+
+
+def _on_start(code: CodeType, offset: int) -> Any:
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return None
+
+    if _skipped(code):
+        return sys.monitoring.DISABLE
+    profiler._calls.append((code, perf_counter()))
+    return None
+
+
+def _on_return(code: CodeType, offset: int, retval: Any) -> Any:
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return None
+
+    if _skipped(code):
+        return sys.monitoring.DISABLE
+
+    start = profiler._pop_call(code)
+    if not isinstance(retval, HTMLElement):
+        if code in _components:
+            return None
+        _not_components.add(code)
+        return sys.monitoring.DISABLE
+
+    _components.add(code)
+    if start is not None:
+        profiler._record_component(code.co_qualname, retval, perf_counter() - start)
+    return None
+
+
+def _on_unwind(code: CodeType, offset: int, exception: BaseException) -> Any:
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler._pop_call(code)
+
+
+def _use_free_tool_id() -> int:
+    for tool_id in _TOOL_IDS:
+        if sys.monitoring.get_tool(tool_id) is not None:
+            continue
+        try:
+            sys.monitoring.use_tool_id(tool_id, "liku")
+        except ValueError:
+            # Taken since it was checked
+            continue
+        return tool_id
+    raise RuntimeError(
+        "No sys.monitoring tool id is free for the profiler, other profilers or "
+        "debuggers are using all of them"
+    )
+
+
+def _install():
+    global _tool_id
+
+    _tool_id = _use_free_tool_id()
+    sys.monitoring.register_callback(_tool_id, _EVENTS.PY_START, _on_start)
+    sys.monitoring.register_callback(_tool_id, _EVENTS.PY_RETURN, _on_return)
+    sys.monitoring.register_callback(_tool_id, _EVENTS.PY_UNWIND, _on_unwind)
+    sys.monitoring.set_events(
+        _tool_id, _EVENTS.PY_START | _EVENTS.PY_RETURN | _EVENTS.PY_UNWIND
+    )
+    _not_components.clear()
+    _components.clear()
+    sys.monitoring.restart_events()
+    HTMLElement.__init__ = _profiled_init  # type: ignore
+
+
+def _uninstall():
+    HTMLElement.__init__ = _original_init  # type: ignore
+    sys.monitoring.set_events(_tool_id, _EVENTS.NO_EVENTS)
+    sys.monitoring.free_tool_id(_tool_id)
+
+
+def _profiled_init(self: HTMLElement, *args: Any, **kwargs: Any):
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _original_init(self, *args, **kwargs)
+
+    start = perf_counter()
+    _original_init(self, *args, **kwargs)
+    stats = profiler._stats("tag", _tag_name(self))
+    stats.calls += 1
+    stats.construct += perf_counter() - start
+
+
+def _tag_name(node: HTMLElement) -> str:
+    return node.__class__.tag_name or node.__class__.__name__
+
+
+class Stats:
+    """Measurements of a component or a tag.
+
+    Attributes:
+        calls (int): Times a component was called, or elements of a tag were created.
+        nodes (int): Elements rendered.
+        construct (float): Seconds spent building, children of a component included.
+        render (float): Seconds spent rendering, children included.
+        escape (float): Seconds spent escaping text and props directly inside.
+        bytes (int): UTF-8 bytes of HTML produced, children included.
+    """
+
+    __slots__ = ("calls", "nodes", "construct", "render", "escape", "bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.nodes = 0
+        self.construct = 0.0
+        self.render = 0.0
+        self.escape = 0.0
+        self.bytes = 0
+
+    def as_dict(self) -> dict[str, int | float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _Frame:
+    __slots__ = ("depth", "keys", "start", "written", "escape")
+
+    def __init__(self, depth: int, keys: list[tuple[str, str]], written: int):
+        self.depth = depth
+        self.keys = keys
+        self.start = perf_counter()
+        self.written = written
+        self.escape = 0.0
+
+
+class Profiler:
+    """Records construction and render time per component and per tag.
+
+    Used as a context manager, only what happens inside of it, in the same thread or
+    context, is recorded. Render times are inclusive: when streaming, they include the
+    time spent by the consumer between chunks.
+
+    ```py
+    with Profiler() as profiler:
+        html = Layout(Posts(posts)).render()
+    print(profiler.report())
+    ```
+    """
+
+    def __init__(self):
+        self.components: dict[str, Stats] = {}
+        self.tags: dict[str, Stats] = {}
+        self._owners: dict[int, str] = {}
+        # Keeps profiled elements alive, so their ids are not reused
+        self._elements: list[HTMLElement] = []
+        self._calls: list[tuple[CodeType, float]] = []
+        self._frames: list[_Frame] = []
+        self._active: dict[tuple[str, str], int] = {}
+        self._written = 0
+        self._token: Token | None = None
+
+    def _stats(self, kind: str, name: str) -> Stats:
+        table = self.components if kind == "component" else self.tags
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = Stats()
+        return stats
+
+    def __enter__(self):
+        global _patch_count
+
+        if self._token is not None:
+            raise RuntimeError("Profiler is already active")
+
+        with _patch_lock:
+            if _patch_count == 0:
+                _install()
+            _patch_count += 1
+
+        self._token = _active_profiler.set(self)
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        global _patch_count
+
+        assert self._token is not None
+        _active_profiler.reset(self._token)
+        self._token = None
+
+        with _patch_lock:
+            _patch_count -= 1
+            if _patch_count == 0:
+                _uninstall()
+
+        self._elements.clear()
+        self._owners.clear()
+        self._calls.clear()
+
+    def _pop_call(self, code: CodeType) -> float | None:
+        calls = self._calls
+        for i in range(len(calls) - 1, -1, -1):
+            called, start = calls[i]
+            if called is code:
+                del calls[i:]
+                return start
+        return None
+
+    def _record_component(self, name: str, node: HTMLElement, elapsed: float):
+        stats = self._stats("component", name)
+        stats.calls += 1
+        stats.construct += elapsed
+        # The innermost component returning an element owns it
+        if id(node) not in self._owners:
+            self._owners[id(node)] = name
+            self._elements.append(node)
+
+    def timed_escape(self, escape: Callable[[str], str]) -> Callable[[str], str]:
+        frames = self._frames
+
+        def timed(s: str) -> str:
+            start = perf_counter()
+            escaped = escape(s)
+            if frames:
+                frames[-1].escape += perf_counter() - start
+            return escaped
+
+        return timed
+
+    def counted_append(self, append: Callable[[str], None]) -> Callable[[str], None]:
+        def counted(piece: str):
+            self._written += len(piece.encode("utf-8", "replace"))
+            append(piece)
+
+        return counted
+
+    def enter(self, node: HTMLElement, depth: int):
+        keys = [("tag", _tag_name(node))]
+        owner = self._owners.get(id(node))
+        if owner is not None:
+            keys.append(("component", owner))
+
+        for key in keys:
+            self._active[key] = self._active.get(key, 0) + 1
+            self._stats(*key).nodes += 1
+        self._frames.append(_Frame(depth, keys, self._written))
+
+    def exit(self, depth: int, encoded: bytes | memoryview | None = None):
+        if not self._frames or self._frames[-1].depth != depth:
+            return
+
+        if encoded is not None:
+            self._written += len(encoded)
+
+        frame = self._frames.pop()
+        elapsed = perf_counter() - frame.start
+        for key in frame.keys:
+            stats = self._stats(*key)
+            stats.escape += frame.escape
+            self._active[key] -= 1
+            # Nested elements of the same tag are only counted once
+            if self._active[key] == 0:
+                stats.render += elapsed
+                stats.bytes += self._written - frame.written
+
+    def stats(self) -> dict[str, dict[str, dict[str, int | float]]]:
+        """Returns every measurement, by component and by tag.
+
+        Returns:
+            dict[str, dict[str, dict[str, int | float]]]: `components` and `tags`, each
+            mapping names into their `Stats` as a dict.
+        """
+        return {
+            "components": {k: v.as_dict() for k, v in self.components.items()},
+            "tags": {k: v.as_dict() for k, v in self.tags.items()},
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Dumps `stats()` as JSON, `kwargs` are given to `json.dumps()`."""
+        return json.dumps(self.stats(), **kwargs)
+
+    def report(self, sort: str = "render", limit: int | None = None) -> str:
+        """Formats the measurements as tables, slowest first.
+
+        Args:
+            sort (str, optional): Column to sort by, one of `render`, `construct`,
+                `escape`, `bytes`, `nodes` or `calls`. Defaults to "render".
+            limit (int | None, optional): Rows to show per table. Defaults to None.
+
+        Raises:
+            ValueError: If `sort` is not a column.
+
+        Returns:
+            str: Report of components, then of tags.
+        """
+        if sort not in _SORT_KEYS:
+            raise ValueError(f"Cannot sort by {sort!r}, expected one of {_SORT_KEYS}")
+
+        lines = []
+        for title, table in (("Component", self.components), ("Tag", self.tags)):
+            rows = sorted(
+                table.items(), key=lambda kv: getattr(kv[1], sort), reverse=True
+            )
+            width = max([len(title), *(len(name) for name, _ in rows)])
+            lines.append(
+                f"{title:<{width}}  {'calls':>7}  {'nodes':>7}  {'construct':>10}"
+                f"  {'render':>10}  {'escape':>10}  {'bytes':>10}"
+            )
+            for name, s in rows[:limit]:
+                lines.append(
+                    f"{name:<{width}}  {s.calls:>7}  {s.nodes:>7}"
+                    f"  {s.construct * 1e3:>8.3f}ms  {s.render * 1e3:>8.3f}ms"
+                    f"  {s.escape * 1e3:>8.3f}ms  {s.bytes:>10}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+
+def profile() -> Profiler:
+    """Creates a `Profiler`, to be used as `with liku.profiler.profile() as p:`."""
+    return Profiler()
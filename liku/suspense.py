@@ -0,0 +1,329 @@
+"""Out-of-order streaming of slow parts of a page.
+
+A `Suspense` boundary wraps a part of a page that waits on something slow. When the page
+is streamed with `iter_render_suspense()` or `iter_render_suspense_async()`, the boundary
+is sent as its fallback right away, its content starts being resolved concurrently, and
+the rest of the page keeps streaming. Once the page is sent, the content of every boundary
+is sent as soon as it is ready, along with what swaps it in place of the fallback. The
+closing `</body>` and `</html>` tags of the page are held back until then.
+
+Outside of those, a boundary renders its content in place, like any other element.
+"""
+
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextvars import ContextVar, copy_context
+import inspect
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Literal
+
+from liku.elements import (
+    Fragment,
+    GenericComponent,
+    HTMLElement,
+    HTMLNode,
+    _EMPTY_PROPS,
+    _active_profiler,
+)
+
+# asyncio and the executors are only imported once used, as they are slow to import
+if TYPE_CHECKING:  # pragma: nocover
+    import asyncio
+    from concurrent.futures import Executor
+
+    from liku import aio
+
+SuspenseContent = HTMLNode | Callable[[], HTMLNode] | Awaitable[Any]
+Swap = Literal["script", "htmx"]
+
+# Replaces the fallback of a boundary with the content of its template
+SWAP_FUNCTION = (
+    "function $liku(i){var f=document.getElementById(i),"
+    't=document.getElementById(i+"-content");f.replaceWith(t.content);t.remove()}'
+)
+
+# Closing tags ending the page, sent after the content of the boundaries
+_TRAILER = re.compile(r"(?:</(?:body|html)>\s*)+$")
+
+_collector: ContextVar["_Collector | None"] = ContextVar("liku_suspense", default=None)
+_default_executor: "Executor | None" = None
+_default_executor_lock = threading.Lock()
+
+
+def default_executor() -> "Executor":
+    """Gets the thread pool running the content of boundaries given as functions."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    global _default_executor
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(thread_name_prefix="liku-suspense")
+        return _default_executor
+
+
+async def _await(awaitable: Awaitable[Any]) -> Any:
+    return await awaitable
+
+
+class Suspense(HTMLElement):
+    """Boundary around content that is slow to resolve, see the module documentation.
+
+    Args:
+        fallback (HTMLNode, optional): Sent while the content is not ready.
+        children (SuspenseContent, optional): The content, as a node, a function
+            building it, or an awaitable such as a call to an async component.
+    """
+
+    __slots__ = ("fallback", "content", "context", "_resolved")
+
+    def __init__(self, fallback: HTMLNode = None, children: SuspenseContent = None):
+        # `children` is computed, so the base initializer cannot set it
+        self.props = _EMPTY_PROPS
+        self.safe = False
+        self.fallback = fallback
+        self.content = children
+        # The content is resolved later, under the context the boundary was created in
+        self.context = copy_context()
+        self._resolved = False
+
+    @property  # type: ignore[override]
+    def children(self) -> list[Any]:
+        collector = _collector.get()
+        if collector is not None:
+            return [collector.suspend(self)]
+
+        # Rendered in place
+        if not self._resolved and callable(self.content):
+            self.content = self.context.copy().run(self.content)
+            self._resolved = True
+        return [self.content]
+
+
+class _Trailer:
+    """Holds back the closing tags ending the page, for boundaries to be sent before."""
+
+    def __init__(self):
+        self.held = ""
+
+    def feed(self, chunk: str) -> str:
+        """Gives what of the chunk can be sent, holding back trailing closing tags."""
+        chunk = self.held + chunk
+        match = _TRAILER.search(chunk)
+        if match is None:
+            self.held = ""
+            return chunk
+        self.held = chunk[match.start() :]
+        return chunk[: match.start()]
+
+
+class _Collector:
+    """Boundaries of one streamed page, and the work resolving their content."""
+
+    def __init__(self, executor: "Executor | None", swap: Swap, nonce: str | None):
+        self.executor = executor
+        self.swap = swap
+        self.nonce = nonce
+        self.loop: "asyncio.AbstractEventLoop | None" = None
+        self.placeholders: dict[int, HTMLElement] = {}
+        self.pending: dict[Any, str] = {}
+        self.swapped = False
+        # Keeps boundaries alive, so their ids are not reused
+        self.boundaries: list[Suspense] = []
+
+    def suspend(self, boundary: Suspense) -> HTMLElement:
+        placeholder = self.placeholders.get(id(boundary))
+        if placeholder is not None:
+            return placeholder
+
+        boundary_id = f"liku-suspense-{len(self.placeholders)}"
+        self.pending[self._start(boundary)] = boundary_id
+        self.boundaries.append(boundary)
+        placeholder = GenericComponent.create("div")(
+            props={"id": boundary_id}, children=boundary.fallback
+        )
+        self.placeholders[id(boundary)] = placeholder
+        return placeholder
+
+    def _start(self, boundary: Suspense) -> Any:
+        import asyncio
+        from concurrent.futures import Future
+
+        content = boundary.content
+        context = boundary.context.copy()
+        # Content rendered while resolving is not part of this page, and is not profiled
+        context.run(_collector.set, None)
+        context.run(_active_profiler.set, None)
+
+        if self.loop is not None:
+            if inspect.iscoroutine(content):
+                return self.loop.create_task(content, context=context)
+            if inspect.isawaitable(content):
+                return asyncio.ensure_future(content)
+            if callable(content):
+                return self.loop.run_in_executor(self.executor, context.run, content)
+            future = self.loop.create_future()
+            future.set_result(content)
+            return future
+
+        executor = self.executor or default_executor()
+        if inspect.isawaitable(content):
+            return executor.submit(context.run, asyncio.run, _await(content))
+        if callable(content):
+            return executor.submit(context.run, content)
+        future: Future = Future()
+        future.set_result(content)
+        return future
+
+    def replacement(self, boundary_id: str, content: Any) -> HTMLElement:
+        """Content of a boundary, with what swaps it in place of its fallback."""
+        if self.swap == "htmx":
+            return GenericComponent.create("div")(
+                props={"id": boundary_id, "hx-swap-oob": "true"}, children=content
+            )
+
+        script = f'$liku("{boundary_id}")'
+        if not self.swapped:
+            script = SWAP_FUNCTION + ";" + script
+            self.swapped = True
+        return Fragment(
+            children=[
+                GenericComponent.create("template")(
+                    props={"id": f"{boundary_id}-content"}, children=content
+                ),
+                GenericComponent.create("script")(
+                    props={"nonce": self.nonce} if self.nonce else None,
+                    children=script,
+                    safe=True,
+                ),
+            ]
+        )
+
+    def cancel(self):
+        for future in self.pending:
+            future.cancel()
+
+
+def iter_render_suspense(
+    node: HTMLNode,
+    chunk_size: int = 4096,
+    executor: "Executor | None" = None,
+    swap: Swap = "script",
+    nonce: str | None = None,
+) -> Iterator[str]:
+    """Streams the node, sending the content of `Suspense` boundaries once ready.
+
+    Boundaries given a function run it on `executor`, and the ones given an awaitable
+    run it with `asyncio.run()` on `executor`.
+
+    Args:
+        node (HTMLNode): Node to render.
+        chunk_size (int, optional): Minimum length of each chunk, see `render_stream()`.
+        executor (Executor | None, optional): Where the content of boundaries is
+            resolved. Defaults to a shared thread pool.
+        swap (Swap, optional): How the content replaces the fallback, "script" for a
+            `<template>` and a small script, "htmx" for an out-of-band swap. Defaults
+            to "script".
+        nonce (str | None, optional): Nonce of the swap scripts, for a Content Security
+            Policy. Defaults to None.
+
+    Yields:
+        str: Chunks of rendered HTML, the page first, then the boundaries, then the
+            closing tags of the page.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    collector = _Collector(executor, swap, nonce)
+
+    def stream(node: HTMLNode) -> Iterator[str]:
+        if not isinstance(node, HTMLElement):
+            node = Fragment(children=node)
+
+        # Only set in the context the node is rendered under, see `render_stream()`
+        token = _collector.set(collector)
+        try:
+            chunks = node.render_stream(chunk_size)
+        finally:
+            _collector.reset(token)
+        yield from chunks
+
+    trailer = _Trailer()
+    try:
+        for chunk in stream(node):
+            if chunk := trailer.feed(chunk):
+                yield chunk
+        while collector.pending:
+            done, _ = wait(collector.pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                boundary_id = collector.pending.pop(future)
+                yield from stream(collector.replacement(boundary_id, future.result()))
+        if trailer.held:
+            yield trailer.held
+    finally:
+        collector.cancel()
+
+
+async def iter_render_suspense_async(
+    node: "aio.AsyncHTMLNode",
+    chunk_size: int = 4096,
+    executor: "Executor | None" = None,
+    swap: Swap = "script",
+    nonce: str | None = None,
+) -> AsyncIterator[str]:
+    """Streams the node like `iter_render_suspense()`, on the running event loop.
+
+    Boundaries given an awaitable run it as a task, and the ones given a function run it
+    with `run_in_executor()`. Awaitables outside of boundaries are resolved in place, see
+    `liku.aio.iter_render_async()`.
+
+    Args:
+        node (AsyncHTMLNode): Node to render.
+        chunk_size (int, optional): Minimum length of each chunk.
+        executor (Executor | None, optional): Executor given to `run_in_executor()`.
+            Defaults to None, the default executor of the loop.
+        swap (Swap, optional): See `iter_render_suspense()`. Defaults to "script".
+        nonce (str | None, optional): Nonce of the swap scripts. Defaults to None.
+
+    Yields:
+        str: Chunks of rendered HTML, the page first and then the boundaries.
+    """
+    import asyncio
+
+    from liku import aio
+
+    collector = _Collector(executor, swap, nonce)
+    collector.loop = asyncio.get_running_loop()
+
+    async def stream(node: "aio.AsyncHTMLNode") -> AsyncIterator[str]:
+        chunks = aio.iter_render_async(node, chunk_size)
+        try:
+            while True:
+                token = _collector.set(collector)
+                try:
+                    chunk = await anext(chunks, None)
+                finally:
+                    _collector.reset(token)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    trailer = _Trailer()
+    try:
+        async for chunk in stream(node):
+            if chunk := trailer.feed(chunk):
+                yield chunk
+        while collector.pending:
+            done, _ = await asyncio.wait(
+                collector.pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                boundary_id = collector.pending.pop(future)
+                replacement = collector.replacement(boundary_id, future.result())
+                async for chunk in stream(replacement):
+                    yield chunk
+        if trailer.held:
+            yield trailer.held
+    finally:
+        collector.cancel()
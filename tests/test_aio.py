@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+import liku as e
+from liku.aio import iter_render_async, render_async
+
+
+async def Comment(text: str, delay: float = 0):
+    await asyncio.sleep(delay)
+    return e.li(children=text)
+
+
+async def Comments(n: int):
+    await asyncio.sleep(0)
+    return e.ul(children=[Comment(f"<comment {i}>") for i in range(n)])
+
+
+def sync_comments(n: int):
+    return e.ul(children=[e.li(children=f"<comment {i}>") for i in range(n)])
+
+
+def test_render_async():
+    page = e.div(children=[e.h1(children="Post"), Comments(3), "footer"])
+    expected = e.div(children=[e.h1(children="Post"), sync_comments(3), "footer"])
+    assert asyncio.run(render_async(page)) == str(expected)
+
+    # Async component as root, and awaitables resolving to text
+    assert asyncio.run(render_async(Comments(2))) == str(sync_comments(2))
+    assert asyncio.run(render_async(e.p(children=asyncio.sleep(0, "<x>")))) == (
+        "<p>&lt;x&gt;</p>"
+    )
+    assert (
+        asyncio.run(render_async(e.p(children=asyncio.sleep(0, "<x>"), safe=True)))
+        == "<p><x></p>"
+    )
+
+
+def test_concurrent():
+    page = e.ul(children=[Comment(str(i), 0.1) for i in range(10)])
+
+    start = time.perf_counter()
+    asyncio.run(render_async(page))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_iter_render_async():
+    async def collect():
+        page = e.html(
+            children=[
+                e.head(children=e.title(children="Title")),
+                e.body(children=Comments(64)),
+            ]
+        )
+        return [chunk async for chunk in iter_render_async(page, chunk_size=128)]
+
+    chunks = asyncio.run(collect())
+    assert chunks[0].startswith("<html><head><title>Title</title>")
+    assert "".join(chunks) == str(
+        e.html(
+            children=[
+                e.head(children=e.title(children="Title")),
+                e.body(children=sync_comments(64)),
+            ]
+        )
+    )
+
+
+def test_sync_render_rejects_awaitables():
+    coroutine = Comments(1)
+    with pytest.raises(TypeError):
+        str(e.div(children=coroutine))
+    coroutine.close()
+
+
+def test_errors_cancel_pending():
+    async def Broken():
+        raise ValueError("broken")
+
+    async def run():
+        slow = asyncio.ensure_future(asyncio.sleep(10))
+        with pytest.raises(ValueError):
+            await render_async(e.div(children=[Broken(), slow]))
+        await asyncio.sleep(0)
+        return slow.cancelled()
+
+    assert asyncio.run(run())
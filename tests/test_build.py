@@ -0,0 +1,157 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from liku import build
+from liku.cli import main
+
+SITE = """
+import json
+import os
+
+import liku as e
+from liku.build import Page
+from liku_layout import Home
+
+
+def Post(post):
+    return e.article(children=[e.h1(children=post["title"]), e.p(children=post["body"])])
+
+
+with open(os.path.join(os.path.dirname(__file__), "posts.json")) as f:
+    POSTS = json.load(f)
+
+ROUTES = {
+    "/": Home,
+    "/404.html": Home,
+    **{f"/posts/{i}": Page(Post, post) for i, post in enumerate(POSTS)},
+}
+"""
+
+
+LAYOUT = """
+import liku as e
+
+
+def Home():
+    return e.h1(children="{title}")
+"""
+
+
+@pytest.fixture()
+def site(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "liku_site.py").write_text(textwrap.dedent(SITE))
+    (tmp_path / "liku_layout.py").write_text(LAYOUT.format(title="Home"))
+
+    def load(posts: list[dict[str, str]]):
+        (tmp_path / "posts.json").write_text(json.dumps(posts))
+        sys.modules.pop("liku_site", None)
+        sys.modules.pop("liku_layout", None)
+        return "liku_site:ROUTES"
+
+    yield load
+    sys.modules.pop("liku_site", None)
+    sys.modules.pop("liku_layout", None)
+
+
+def posts(*titles: str):
+    return [{"title": title, "body": "<body>"} for title in titles]
+
+
+def test_output_path():
+    assert build.output_path("/") == "index.html"
+    assert build.output_path("/docs/") == os.path.join("docs", "index.html")
+    assert build.output_path("/about") == os.path.join("about", "index.html")
+    assert build.output_path("/404.html") == "404.html"
+
+    with pytest.raises(ValueError):
+        build.output_path("/../secret")
+
+
+def test_build(site, tmp_path):
+    spec = site(posts("A", "B", "C"))
+    output = tmp_path / "out"
+
+    result = build.build(spec, str(output), jobs=2)
+    assert sorted(result.built) == [
+        "/",
+        "/404.html",
+        "/posts/0",
+        "/posts/1",
+        "/posts/2",
+    ]
+    assert (output / "index.html").read_text() == "<h1>Home</h1>"
+    assert (output / "posts" / "1" / "index.html").read_text() == (
+        "<article><h1>B</h1><p>&lt;body&gt;</p></article>"
+    )
+
+    result = build.build(spec, str(output), jobs=1)
+    assert result.built == []
+    assert len(result.skipped) == 5
+
+    # Only pages whose data changed, removed pages and missing files are touched
+    spec = site(posts("A", "Changed"))
+    (output / "index.html").unlink()
+    result = build.build(spec, str(output), jobs=1)
+    assert result.built == ["/", "/posts/1"]
+    assert result.removed == ["/posts/2"]
+    assert not (output / "posts" / "2" / "index.html").exists()
+    assert "Changed" in (output / "posts" / "1" / "index.html").read_text()
+
+    # Pages of components from a module imported by the routes are rebuilt
+    (tmp_path / "liku_layout.py").write_text(LAYOUT.format(title="Welcome"))
+    spec = site(posts("A", "Changed"))
+    result = build.build(spec, str(output), jobs=1)
+    assert len(result.built) == 4
+    assert (output / "index.html").read_text() == "<h1>Welcome</h1>"
+
+    assert len(build.build(spec, str(output), jobs=1, force=True).built) == 4
+    assert not [name for name in os.listdir(output) if name.endswith(".tmp")]
+
+
+def test_write_atomic(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        path = tmp_path / "page.html"
+        build.write_atomic(str(path), lambda f: f.write(b"<p>Page</p>"))
+    finally:
+        os.umask(umask)
+    assert path.read_bytes() == b"<p>Page</p>"
+    assert path.stat().st_mode & 0o777 == 0o644
+
+
+def test_data_hash():
+    data_hash = (
+        "from liku.build import _data_hash;"
+        "print(_data_hash({'tags': {'a', 'b', 'c', 'd'}, 'count': 1}))"
+    )
+    hashes = {
+        subprocess.run(
+            [sys.executable, "-c", data_hash],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(hashes) == 1
+
+    assert build._data_hash({"a": 1, "b": 2}) == build._data_hash({"b": 2, "a": 1})
+    assert build._data_hash((1, 2)) != build._data_hash([1, 2])
+    assert build._data_hash(1) != build._data_hash(True)
+    # Data that cannot be pickled is hashed too
+    build._data_hash({"render": lambda: None})
+
+
+def test_cli(site, tmp_path, capsys):
+    spec = site(posts("A"))
+    output = tmp_path / "out"
+    assert main(["build", spec, "-o", str(output), "-j", "1"]) == 0
+    assert "3 built, 0 unchanged, 0 removed" in capsys.readouterr().out
+    assert (output / "404.html").exists()
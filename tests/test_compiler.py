@@ -0,0 +1,76 @@
+import pytest
+
+import liku as e
+from liku import minify
+from liku.compiler import CompileError
+
+
+def Card(title: str, description, href: str = "#", *, hidden: bool = False):
+    return e.div(
+        props={"class_": "card", "hidden": hidden},
+        children=[
+            e.strong(children=title),
+            e.p(children=description),
+            e.a(
+                props={"href": href, "data-title": f"post-{title}"},
+                children=f"Read {title} & more",
+            ),
+            e.br(),
+        ],
+    )
+
+
+def test_compile():
+    compiled = e.compile(Card)
+    assert compiled.__name__ == "Card"
+
+    for args, kwargs in [
+        (("Hello", "world"), {}),
+        (("<script>", ["a", e.b(children="<b>"), None]), {"href": "/?a=1&b=2"}),
+        (("1", e.freeze(e.i(children="x"))), {"hidden": True}),
+    ]:
+        assert compiled(*args, **kwargs) == str(Card(*args, **kwargs))
+
+
+def test_compile_safe():
+    def Raw(html: str):
+        return e.div(children=[e.script(children=html, safe=True), e.p(children=html)])
+
+    assert e.compile(Raw)("<b>") == "<div><script><b></script><p>&lt;b&gt;</p></div>"
+
+
+def test_compile_errors():
+    def Upper(title: str):
+        return e.p(children=title.upper())
+
+    def Args(*titles: str):
+        return e.p(children=titles)
+
+    with pytest.raises(CompileError):
+        e.compile(Upper)
+
+    with pytest.raises(TypeError):
+        e.compile(Args)
+
+
+def test_compile_positional_only():
+    def Link(href: str, /, title: str):
+        return e.a(props={"href": href}, children=title)
+
+    compiled = e.compile(Link)
+    assert compiled("/posts", title="Posts") == str(Link("/posts", title="Posts"))
+    with pytest.raises(TypeError):
+        compiled(href="/posts", title="Posts")
+
+
+def test_compile_minified():
+    compiled = e.compile(Card)
+    minify.set_minify(True)
+    try:
+        assert compiled("Hello  world", "x", hidden=True) == str(
+            Card("Hello  world", "x", hidden=True)
+        )
+        assert e.compile(Card)("a", "b") == str(Card("a", "b"))
+    finally:
+        minify.set_minify(False)
+    assert compiled("a", "b") == str(Card("a", "b"))
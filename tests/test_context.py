@@ -1,4 +1,11 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import liku as e
+from liku.aio import render_async
 from liku.context import Context, use_context
+from liku.parallel import render_parallel
+from liku.suspense import iter_render_suspense
 
 import pytest
 
@@ -25,3 +32,91 @@ def test_default():
         assert use_context(ctx) == "sample"
 
     assert ctx.get() == "defaultvalue"
+
+
+ThemeContext = Context("theme")
+
+
+def Themed():
+    return e.span(children=use_context(ThemeContext))
+
+
+async def AsyncThemed():
+    await asyncio.sleep(0)
+    return Themed()
+
+
+def test_lazy_children():
+    with ThemeContext.provide("dark"):
+        page = e.div(children=(Themed() for _ in range(2)))
+        mapped = e.For(each=range(2), children=[lambda _: Themed()])
+
+    with ThemeContext.provide("light"):
+        assert page.render() == "<div><span>dark</span><span>dark</span></div>"
+        assert mapped.render() == "<span>dark</span><span>dark</span>"
+
+
+def test_stream():
+    with ThemeContext.provide("dark"):
+        chunks = e.div(children=(Themed() for _ in range(2))).render_stream(1)
+
+    with pytest.raises(LookupError):
+        ThemeContext.get()
+    assert "".join(chunks) == "<div><span>dark</span><span>dark</span></div>"
+
+
+def test_nested_providers():
+    def Page():
+        return e.div(
+            children=[
+                Themed(),
+                ThemeContext.Provider("light", lambda: e.div(children=Themed())),
+                Themed(),
+            ]
+        )
+
+    page = ThemeContext.Provider("dark", Page)
+    assert page.render() == (
+        "<div><span>dark</span><div><span>light</span></div><span>dark</span></div>"
+    )
+
+
+def test_async():
+    page = ThemeContext.Provider(
+        "dark",
+        lambda: e.div(
+            children=[
+                AsyncThemed(),
+                ThemeContext.Provider("light", lambda: e.p(children=AsyncThemed())),
+            ]
+        ),
+    )
+    assert asyncio.run(render_async(page)) == (
+        "<div><span>dark</span><p><span>light</span></p></div>"
+    )
+
+
+def test_suspense():
+    with ThemeContext.provide("dark"):
+        page = e.div(
+            children=[
+                e.Suspense(children=Themed),
+                e.Suspense(children=AsyncThemed()),
+            ]
+        )
+
+    with ThreadPoolExecutor(2) as executor:
+        html = "".join(iter_render_suspense(page, executor=executor, swap="htmx"))
+    assert html.count("<span>dark</span>") == 2
+
+
+def test_parallel():
+    with ThemeContext.provide("dark"):
+        page = e.ul(children=[e.li(children=(Themed(),)) for _ in range(100)])
+        lazy = e.ul(children=(e.li(children=Themed()) for _ in range(100)))
+
+    with ThreadPoolExecutor(4) as executor:
+        assert render_parallel(page, threshold=10, executor=executor) == str(page)
+        assert render_parallel(lazy, threshold=10, executor=executor) == (
+            "<ul>" + "<li><span>dark</span></li>" * 100 + "</ul>"
+        )
@@ -0,0 +1,76 @@
+import pytest
+
+import liku as e
+
+
+def Card(id: int, title: str):
+    return e.div(
+        props={"id": f"post-{id}", "key": id}, children=e.strong(children=title)
+    )
+
+
+def Posts(posts: dict[int, str], header: str = "Posts"):
+    return e.div(
+        props={"id": "posts"},
+        children=[
+            e.h1(children=header),
+            *[Card(id, title) for id, title in posts.items()],
+        ],
+    )
+
+
+def test_diff():
+    old = Posts({1: "One", 2: "Two", 3: "Three"})
+    assert e.diff(old, Posts({1: "One", 2: "Two", 3: "Three"})) == []
+
+    swaps = e.diff(old, Posts({1: "One", 2: "Deux", 3: "Three"}))
+    assert [str(swap) for swap in swaps] == [
+        '<div id="post-2" hx-swap-oob="true"><strong>Deux</strong></div>'
+    ]
+
+
+def test_diff_structure():
+    old = Posts({1: "One", 2: "Two"})
+
+    # Without an id, the header is swapped with its closest parent that has one.
+    (swap,) = e.diff(old, Posts({1: "One", 2: "Two"}, header="All posts"))
+    assert swap.props["id"] == "posts"
+    assert swap.props["hx-swap-oob"] == "true"
+
+    (swap,) = e.diff(old, Posts({2: "Two", 1: "One"}))
+    assert swap.props["id"] == "posts"
+
+    with pytest.raises(ValueError):
+        e.diff(e.p(children="a"), e.p(children="b"))
+
+
+def test_diff_unkeyed():
+    def List(title: str, item: str):
+        return e.div(
+            props={"id": "list"},
+            children=[
+                e.h1(children=title),
+                e.ul(
+                    props={"key": "items"},
+                    children=e.li(props={"id": "a"}, children=item),
+                ),
+                e.p(children="Footer"),
+            ],
+        )
+
+    # Unkeyed siblings are matched by position, not with each other
+    assert e.diff(List("Title", "a"), List("Title", "a")) == []
+    (swap,) = e.diff(List("Title", "a"), List("Title", "b"))
+    assert str(swap) == '<li id="a" hx-swap-oob="true">b</li>'
+
+    (swap,) = e.diff(List("Title", "a"), List("Other", "a"))
+    assert swap.props["id"] == "list"
+
+
+def test_key_not_rendered():
+    assert str(e.li(props={"key": 1, "class_": "item"})) == '<li class="item"></li>'
+    assert str(e.li(props={"key": 1})) == "<li></li>"
+    assert str(e.li(props={"key_": "a"})) == '<li key="a"></li>'
+    assert e.compile(lambda title: e.li(props={"key": 1}, children=title))("a") == (
+        "<li>a</li>"
+    )
@@ -0,0 +1,79 @@
+import pickle
+
+import pytest
+
+import liku as e
+from liku import minify
+from liku.document import Document, DocumentBuilder
+
+
+def Page():
+    return e.html(
+        children=[
+            e.head(
+                children=[e.meta(props={"charset": "utf-8"}), e.title(children="A & B")]
+            ),
+            e.body(
+                props={"class_": "p-4", "data-count": 3},
+                children=[
+                    e.Fragment(children=["fragment ", e.b(children="<bold>")]),
+                    e.script(children="if (a < b) {}", safe=True),
+                    e.pre(children="  keep\n  this"),
+                    e.p(children="  collapse\n  this  "),
+                    e.input(props={"disabled": True, "required": False}),
+                    e.freeze(e.footer(children="static")),
+                    None,
+                ],
+            ),
+        ]
+    )
+
+
+def test_document():
+    page = Page()
+    document = Document.from_element(page)
+    assert document.render() == page.render()
+    assert str(e.div(children=document)) == f"<div>{page}</div>"
+    assert document.tags.count("p") == 1
+
+    minify.set_minify(True)
+    try:
+        assert document.render() == page.render()
+    finally:
+        minify.set_minify(False)
+
+    assert pickle.loads(pickle.dumps(document)).render() == page.render()
+
+
+def test_document_to_element():
+    page = Page()
+    element = Document.from_element(page).to_element()
+    assert isinstance(element, e.HTMLElement)
+    assert element.render() == page.render()
+    assert Document.from_element(element).render() == page.render()
+
+
+def test_document_builder():
+    builder = DocumentBuilder()
+    builder.open(e.ul, {"id": "posts"})
+    for i in range(3):
+        builder.append(e.li(props={"class_": "post"}, children=f"Post {i}"))
+    builder.open("li")
+    builder.text("<raw>", safe=True)
+    builder.close()
+    builder.open("br")
+
+    with pytest.raises(ValueError):
+        builder.build()
+
+    builder.close()
+    document = builder.build()
+    assert document.render() == (
+        '<ul id="posts"><li class="post">Post 0</li><li class="post">Post 1</li>'
+        '<li class="post">Post 2</li><li><raw></li><br /></ul>'
+    )
+    # Repeated strings are only stored once
+    assert document.text.count("post") == 2
+
+    with pytest.raises(ValueError):
+        builder.close()
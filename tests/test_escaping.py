@@ -0,0 +1,95 @@
+import html
+
+import markupsafe
+import pytest
+import liku as e
+from liku import escaping
+from liku.document import Document
+
+SAMPLES = [
+    "",
+    "plain text",
+    "Tom & Jerry's <b>\"show\"</b>",
+    "&amp; &#39; &#34; already escaped",
+    "ünïcödé < 日本語 >",
+]
+
+
+@pytest.mark.parametrize("name", list(escaping.ESCAPERS))
+def test_escapers(name: str):
+    escaper = escaping.ESCAPERS[name]
+    for sample in SAMPLES:
+        assert escaper(sample) == html.escape(sample)
+
+
+@pytest.mark.parametrize("name", list(escaping.ESCAPERS))
+def test_set_escaper(name: str):
+    elem = e.div(props={"title": "\"quoted\""}, children="<script>alert('x')</script>")
+    expected = str(elem)
+
+    try:
+        escaping.set_escaper(name)
+        assert escaping.get_escaper() is escaping.ESCAPERS[name]
+        assert str(elem) == expected
+    finally:
+        escaping.set_escaper("auto")
+
+
+def test_custom_escaper():
+    try:
+        escaping.set_escaper(lambda s: s.upper())
+        assert str(e.p(children="custom")) == "<p>CUSTOM</p>"
+    finally:
+        escaping.set_escaper("auto")
+
+    # Props formatted with another escaper are not reused
+    elem = e.p(props={"title": "cached"})
+    assert str(elem) == '<p title="cached"></p>'
+    try:
+        escaping.set_escaper(lambda s: s.upper())
+        assert str(elem) == '<p title="CACHED"></p>'
+    finally:
+        escaping.set_escaper("auto")
+    assert str(elem) == '<p title="cached"></p>'
+
+    with pytest.raises(ValueError):
+        escaping.set_escaper("unknown")
+
+
+def test_markup():
+    bold = e.Markup("<b>bold</b>")
+    elem = e.p(
+        props={"title": e.Markup("&quot;quoted&quot;"), "data-raw": '"quoted"'},
+        children=[bold, " <i>", markupsafe.Markup("<i>italic</i>")],
+    )
+    expected = (
+        '<p title="&quot;quoted&quot;" data-raw="&quot;quoted&quot;">'
+        "<b>bold</b> &lt;i&gt;<i>italic</i></p>"
+    )
+    assert str(elem) == expected
+    assert Document.from_element(elem).render() == expected
+    assert Document.from_element(elem).to_element().render() == expected
+
+    assert e.Markup.escape("<b>") == "&lt;b&gt;"
+    assert e.Markup.escape(bold) is bold
+    assert isinstance(e.Markup.escape("a"), e.Markup)
+
+    # Operations give plain strings, which are escaped again
+    assert str(e.p(children=bold + "!")) == "<p>&lt;b&gt;bold&lt;/b&gt;!</p>"
+
+
+def test_markup_props_cached():
+    # Markup("a") == "a", so the plain string cached first must not be used for it
+    assert str(e.p(props={"title": "Tom &amp; Jerry"})) == (
+        '<p title="Tom &amp;amp; Jerry"></p>'
+    )
+    elem = e.p(props={"title": e.Markup("Tom &amp; Jerry")})
+    assert str(elem) == '<p title="Tom &amp; Jerry"></p>'
+    assert Document.from_element(elem).render() == '<p title="Tom &amp; Jerry"></p>'
+
+
+def test_markup_compiled():
+    card = e.compile(lambda title: e.div(children=e.strong(children=title)))
+    html = card("<T>")
+    assert isinstance(html, e.Markup)
+    assert str(e.section(children=html)) == f"<section>{html}</section>"
@@ -1,7 +1,11 @@
+import gzip
+import zlib
+
 from flask import Flask
 import pytest
 import liku as e
-from liku.integrations.flask import component
+from liku import http
+from liku.integrations.flask import component, profile_requests
 
 
 @pytest.fixture()
@@ -66,3 +70,183 @@ def test_integration(app):
     assert response.headers.get("X-Example") == "Hello"
     assert response.status_code == 200
     assert response.content_type == "text/html; charset=utf-8"
+
+
+def test_compression(app):
+    elem = e.ul(children=[e.li(children=f"Item {i}") for i in range(200)])
+
+    @component
+    def f():
+        return elem
+
+    @component(min_size=10_000, level=9)
+    def f_large_only():
+        return elem, 201
+
+    with app.test_request_context(
+        headers={"Accept-Encoding": "gzip;q=1, deflate;q=0.5"}
+    ):
+        response = f()
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(response.get_data()).decode() == str(elem)
+
+        response = f_large_only()
+        assert "Content-Encoding" not in response.headers
+        assert response.status_code == 201
+        assert response.get_data(True) == str(elem)
+
+    with app.test_request_context(headers={"Accept-Encoding": "deflate, gzip;q=0"}):
+        response = f()
+        assert response.headers["Content-Encoding"] == "deflate"
+        assert zlib.decompress(response.get_data()).decode() == str(elem)
+
+    with app.test_request_context(headers={"Accept-Encoding": "identity"}):
+        assert "Content-Encoding" not in f().headers
+
+
+def test_negotiate_encoding():
+    assert http.negotiate_encoding(None) is None
+    assert http.negotiate_encoding("gzip, deflate") == "gzip"
+    assert http.negotiate_encoding("deflate;q=0.5, gzip;q=0.8") == "gzip"
+    assert http.negotiate_encoding("*;q=0") is None
+    assert http.negotiate_encoding("identity, *;q=0.1") in http.ENCODINGS
+
+
+def test_etag(app):
+    calls = []
+    elem = e.p(children="Hello world!")
+
+    @component
+    def f():
+        calls.append("f")
+        return elem
+
+    @component(cache_key=lambda post_id: f"post-{post_id}")
+    def f_keyed(post_id: int):
+        calls.append(post_id)
+        return elem
+
+    with app.test_request_context():
+        etag = f().headers["ETag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+    with app.test_request_context(headers={"If-None-Match": f'W/"other", {etag}'}):
+        response = f()
+        assert response.status_code == 304
+        assert response.get_data() == b""
+        assert response.headers["ETag"] == etag
+
+    with app.test_request_context():
+        etag = f_keyed(1).headers["ETag"]
+    assert calls == ["f", "f", 1]
+
+    with app.test_request_context(headers={"If-None-Match": etag}):
+        assert f_keyed(1).status_code == 304
+        assert f_keyed(2).status_code == 200
+    assert calls == ["f", "f", 1, 2]
+
+
+def test_prepare_response():
+    elem = e.ul(children=[e.li(children=f"Item {i}") for i in range(200)])
+
+    response = http.prepare_response(elem, accept_encoding="gzip")
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert gzip.decompress(response.body) == elem.render_bytes()
+
+    etag = response.headers["ETag"]
+    response = http.prepare_response(elem, "gzip", if_none_match=etag)
+    assert (response.status, response.body) == (304, b"")
+
+    def build():
+        raise AssertionError("Rendered despite a matching cache key")
+
+    # With a cache key, the body does not need to be hashed and is streamed
+    response = http.prepare_response(elem, "gzip", cache_key="v1")
+    assert not isinstance(response.body, bytes)
+    assert gzip.decompress(b"".join(response.body)) == elem.render_bytes()
+
+    etag = response.headers["ETag"]
+    assert http.prepare_response(build, "gzip", etag, cache_key="v1").status == 304
+
+
+def test_encode_body():
+    elem = e.ul(children=[e.li(children=f"Item {i}") for i in range(2000)])
+
+    encoded = http.encode_body(elem, "gzip", chunk_size=1024, etag=False)
+    assert encoded.etag is None
+    chunks = list(encoded.body)
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)) == elem.render_bytes()
+
+    encoded = http.encode_body(elem, None, etag=False)
+    assert b"".join(encoded.body) == elem.render_bytes()
+
+    # Small bodies are sent as-is, and bodies with an ETag are buffered
+    small = http.encode_body(e.p(children="Hi"), "gzip")
+    assert (small.body, small.encoding) == (b"<p>Hi</p>", None)
+    assert isinstance(http.encode_body(elem, "gzip").body, bytes)
+
+
+def test_streamed(app):
+    elem = e.ul(children=[e.li(children=f"Item {i}") for i in range(200)])
+
+    @component(etag=False)
+    def f():
+        return elem
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = f()
+        assert response.is_streamed
+        assert "ETag" not in response.headers
+        assert gzip.decompress(response.get_data()) == elem.render_bytes()
+
+
+def test_profile_requests():
+    app = Flask("liku")
+    profiles = []
+    profile_requests(app, profiles.append)
+
+    def Greeting(name: str):
+        return e.p(children=f"Hello {name}!")
+
+    @app.get("/")
+    @component
+    def index():
+        return e.div(children=Greeting("world"))
+
+    assert app.test_client().get("/").status_code == 200
+    (profiler,) = profiles
+    assert profiler.components["test_profile_requests.<locals>.Greeting"].calls == 1
+    assert profiler.tags["div"].nodes == 1
+
+
+def test_streamed_cache_key(app):
+    rendered = []
+
+    def rows():
+        for i in range(5000):
+            rendered.append(i)
+            yield e.li(children=f"Item {i}")
+
+    @component(cache_key=lambda: "v1")
+    def f():
+        return e.ul(children=rows())
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = f()
+        assert response.is_streamed
+        assert "Content-Length" not in response.headers
+        # Not rendered before the body is read
+        assert len(rendered) < 5000
+        body = gzip.decompress(response.get_data())
+        assert body.count(b"<li>") == 5000
+        etag = response.headers["ETag"]
+
+    headers = {"Accept-Encoding": "gzip", "If-None-Match": etag}
+    with app.test_request_context(headers=headers):
+        rendered.clear()
+        assert f().status_code == 304
+        assert rendered == []
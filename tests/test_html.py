@@ -1,7 +1,13 @@
+import gc
 import html
+import io
+import pickle
+import sys
+import weakref
 from typing import Type
 import pytest
 import liku as e
+from liku import minify
 from liku.elements import HTMLElement
 
 
@@ -122,3 +128,266 @@ def test_void_element():
             str(elem(props={"class_": "sample"}, children="not used"))
             == f'<{elem.__name__} class="sample" />'
         )
+
+
+def test_iter_render():
+    elem = e.html(
+        children=[
+            e.head(children=e.title(children="<Title>")),
+            e.body(children=[e.p(children=str(i)) for i in range(3)]),
+        ]
+    )
+    pieces = elem.iter_render()
+    assert next(pieces) == "<html>"
+    assert next(pieces) == "<head>"
+    assert "".join(pieces) == str(elem)[len("<html><head>") :]
+
+    assert list(e.br(props={"class_": "x"}).iter_render()) == ['<br class="x" />']
+    assert "".join(e.Fragment(children=["a", e.b(children="b")]).iter_render()) == (
+        "a<b>b</b>"
+    )
+
+
+def test_render_stream():
+    elem = e.div(children=[e.p(children="Hello world!") for _ in range(64)])
+    chunks = list(elem.render_stream(chunk_size=100))
+    assert "".join(chunks) == str(elem)
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+
+    assert list(e.p(children="small").render_stream()) == ["<p>small</p>"]
+
+
+def test_deep_tree():
+    elem = e.span(children="deep")
+    for _ in range(sys.getrecursionlimit() * 2):
+        elem = e.div(children=elem)
+
+    depth = sys.getrecursionlimit() * 2
+    assert str(elem) == "<div>" * depth + "<span>deep</span>" + "</div>" * depth
+
+
+def test_custom_render():
+    class Raw(HTMLElement):
+        def render(self):
+            return "<raw />"
+
+    elem = e.div(children=[Raw(), e.p(children=Raw())])
+    assert str(elem) == "<div><raw /><p><raw /></p></div>"
+    assert "".join(elem.iter_render()) == str(elem)
+
+
+def test_registry():
+    assert e.h("div").__class__ is e.div
+    assert e.h("del").__class__ is e.del_
+    assert e.GenericComponent.create("sample") is e.GenericComponent.create("sample")
+    assert isinstance(e.h("custom-tag"), e.GenericComponent.create("custom-tag"))
+
+    # Explicitly non-void tags are kept apart from the void ones
+    assert e.GenericComponent.create("br", False) is not e.br
+    assert str(e.GenericComponent.create("br", False)()) == "<br></br>"
+
+
+def test_registry_maxsize():
+    try:
+        e.GenericComponent.set_registry_maxsize(2)
+        first = e.GenericComponent.create("untrusted-1")
+        e.GenericComponent.create("untrusted-2")
+        e.GenericComponent.create("untrusted-3")
+
+        assert e.GenericComponent.create("untrusted-1") is not first
+        # Exported tags are never evicted
+        assert e.h("div").__class__ is e.div
+
+        # Evicted classes are not kept alive
+        evicted = weakref.ref(first)
+        del first
+        gc.collect()
+        assert evicted() is None
+    finally:
+        e.GenericComponent.set_registry_maxsize(None)
+
+
+def test_pickle():
+    elem = e.div(
+        props={"class_": "card"},
+        children=[e.h("custom", children="text"), e.br(), e.Fragment(children="x")],
+        safe=True,
+    )
+    restored = pickle.loads(pickle.dumps(elem))
+    assert isinstance(restored, e.div)
+    assert restored.safe
+    assert str(restored) == str(elem)
+
+
+def test_compact_nodes():
+    elem = e.div()
+    assert not hasattr(elem, "__dict__")
+    assert not hasattr(e.Fragment(), "__dict__")
+
+    # Empty props and children are shared, and cannot be mutated
+    assert elem.props is e.p().props
+    assert elem.children is e.p().children
+    with pytest.raises(TypeError):
+        elem.props["class_"] = "x"  # type: ignore
+
+    assert str(pickle.loads(pickle.dumps(elem))) == "<div></div>"
+
+
+def test_props_cache():
+    # Equal but differently typed values must not share a cache entry
+    assert e.input(props={"value": 1}).format_props() == 'value="1"'
+    assert e.input(props={"value": True}).format_props() == 'value="true"'
+    assert e.input(props={"value": 1}).format_props() == 'value="1"'
+
+    assert e.label(props={"for_": "name"}).format_props() == 'for="name"'
+    assert e.h("x", props={"custom_": "y"}).format_props() == 'custom="y"'
+
+    component = e.a(props={"invalid": 1.5})  # type: ignore
+    with pytest.raises(TypeError):
+        component.format_props()
+
+
+def test_freeze():
+    head = e.head(
+        children=[
+            e.title(children="<Hello>"),
+            e.meta(props={"charset": "utf-8"}),
+        ]
+    )
+    frozen = e.freeze(head)
+    assert str(frozen) == str(head)
+    assert e.freeze(frozen) is frozen
+    assert str(e.freeze(["a", e.b(children="b")])) == "a<b>b</b>"
+
+    page = e.html(children=[frozen, e.body(children="<body>")])
+    assert str(page) == f"<html>{head}<body>&lt;body&gt;</body></html>"
+
+    with pytest.raises(e.FrozenElementError):
+        frozen.children = []  # type: ignore
+    with pytest.raises(e.FrozenElementError):
+        del frozen.html
+    with pytest.raises(TypeError):
+        frozen.props["class_"] = "x"  # type: ignore
+
+    assert str(pickle.loads(pickle.dumps(frozen))) == str(head)
+
+
+def test_static():
+    calls = []
+
+    @e.static
+    def Nav():
+        calls.append(1)
+        return e.nav(children=e.a(props={"href": "/"}, children="Home"))
+
+    assert Nav() is Nav()
+    assert str(Nav()) == '<nav><a href="/">Home</a></nav>'
+    assert len(calls) == 1
+
+
+def test_render_bytes():
+    elem = e.div(children=[e.p(children="héllo <wörld>") for _ in range(64)])
+    assert elem.render_bytes() == str(elem).encode()
+    assert elem.render_bytes("utf-16") == str(elem).encode("utf-16")
+    assert b"".join(elem.iter_render_bytes(chunk_size=100)) == str(elem).encode()
+
+    buffer = io.BytesIO()
+    assert elem.render_into(buffer, chunk_size=100) == len(str(elem).encode())
+    assert buffer.getvalue() == str(elem).encode()
+
+
+def test_render_bytes_static():
+    frozen = e.freeze(e.head(children=e.title(children="日本語")))
+    page = e.html(children=[frozen, e.body(children="body")])
+
+    chunks = list(page.iter_render_bytes())
+    assert b"".join(chunks) == str(page).encode()
+    # Cached bytes are reused, instead of being encoded again
+    cached = [chunk for chunk in chunks if isinstance(chunk, memoryview)]
+    assert len(cached) == 1
+    assert cached[0] is frozen._encoded("utf-8")
+
+    assert page.render_bytes("utf-16-le") == str(page).encode("utf-16-le")
+    # The BOM is only written once
+    assert page.render_bytes("utf-16") == str(page).encode("utf-16")
+    assert page.render_bytes("utf-16").decode("utf-16") == str(page)
+    assert b"".join(page.iter_render_bytes(chunk_size=1, encoding="utf-16")) == (
+        str(page).encode("utf-16")
+    )
+
+
+def test_lazy_children():
+    consumed = []
+
+    def rows(n: int):
+        for i in range(n):
+            consumed.append(i)
+            yield e.li(children=str(i))
+
+    elem = e.ul(children=rows(100))
+    assert consumed == []
+
+    chunks = elem.render_stream(chunk_size=64)
+    first = next(chunks)
+    assert first.startswith("<ul><li>0</li>")
+    # Only what was needed for the first chunk has been consumed
+    assert len(consumed) < 100
+
+    assert first + "".join(chunks) == str(
+        e.ul(children=[e.li(children=str(i)) for i in range(100)])
+    )
+    with pytest.raises(RuntimeError):
+        str(elem)
+
+    # Iterables that can be iterated again render every time
+    reusable = e.p(children=("a", "<b>"))
+    assert str(reusable) == str(reusable) == "<p>a&lt;b&gt;</p>"
+
+
+def test_for():
+    elem = e.For(
+        each=range(3),
+        children=[lambda i: e.li(children=str(i)), e.hr()],
+    )
+    assert str(elem) == "<li>0</li><li>1</li><li>2</li><hr />"
+    assert str(elem) == "<li>0</li><li>1</li><li>2</li><hr />"
+
+    # Rows are only built while rendering
+    built = []
+    elem = e.For(each=range(3), children=[lambda i: built.append(i) or str(i)])
+    assert built == []
+    assert str(elem) == "012"
+    assert built == [0, 1, 2]
+
+    # Over an iterator, rendering again raises instead of rendering nothing
+    elem = e.For(each=(i for i in range(3)), children=[lambda i: e.li(children=str(i))])
+    assert str(elem) == "<li>0</li><li>1</li><li>2</li>"
+    with pytest.raises(RuntimeError):
+        str(elem)
+
+
+def test_minify():
+    page = e.div(
+        props={"class_": "a b", "id": "main"},
+        children=[
+            e.p(children="  Hello \n\t world  "),
+            e.pre(children=["  keep\n", e.b(children="  this  ")]),
+            e.input(props={"disabled": True, "required": False, "value": "a=b"}),
+            e.input(props={"hidden": False}),
+            e.div(props={"hx-boost": True}),
+            e.p(children="\xa0 after"),
+        ],
+    )
+    expected = (
+        '<div class="a b" id=main><p> Hello world </p>'
+        "<pre>  keep\n<b>  this  </b></pre>"
+        '<input disabled value="a=b"><input><div hx-boost=true></div><p>\xa0 after</p></div>'
+    )
+
+    minify.set_minify(True)
+    try:
+        assert str(page) == expected
+    finally:
+        minify.set_minify(False)
+    assert 'disabled="true"' in str(page)
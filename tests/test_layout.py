@@ -0,0 +1,73 @@
+import pytest
+
+import liku as e
+from liku import minify
+
+
+def Layout(content: e.HTMLNode, title: str = "My Blog"):
+    return e.html(
+        children=[
+            e.head(children=e.title(children=title)),
+            e.body(
+                children=e.div(props={"class_": "container"}, children=content),
+            ),
+        ]
+    )
+
+
+def test_shell():
+    shell = e.shell(Layout)
+    assert shell.slots == ("title", "content")
+    assert len(shell.segments) == 3
+
+    content = [e.h1(children="Hello"), "<world>"]
+    assert str(shell(content)) == str(Layout(content))
+    assert str(shell(content, title="Home & away")) == str(
+        Layout(content, title="Home & away")
+    )
+
+    # The segments are encoded once, and streamed as-is on every render
+    first = list(shell(content).iter_render_bytes())
+    second = list(shell(e.p(children="Other")).iter_render_bytes())
+    assert first[0] is second[0]
+    assert b"".join(first) == Layout(content).render_bytes()
+
+
+def test_shell_slots():
+    shell = e.Shell(e.div(children=[e.Slot("a"), e.hr(), e.Slot("b"), e.Slot("a")]))
+    assert str(shell(a="1", b=e.b(children="2"))) == "<div>1<hr /><b>2</b>1</div>"
+
+    with pytest.raises(TypeError):
+        shell(a="1")
+    with pytest.raises(TypeError):
+        shell(a="1", b="2", c="3")
+    with pytest.raises(TypeError):
+        shell("1", "2")
+
+
+def test_shell_slot_parents():
+    def Page(script: str, code: e.HTMLNode):
+        return e.div(
+            children=[
+                e.script(children=script, safe=True),
+                e.pre(children=e.code(children=code)),
+            ]
+        )
+
+    layout = e.shell(Page)
+    script = "if (a < b) {}"
+    code = ["a  =  1\n", e.b(children="b  =  2")]
+    assert str(layout(script, code)) == str(Page(script, code))
+
+    minify.set_minify(True)
+    try:
+        layout = e.shell(Page)
+        assert str(layout(script, code)) == str(Page(script, code))
+        assert "a  =  1\n<b>b  =  2</b>" in str(layout(script, code))
+    finally:
+        minify.set_minify(False)
+
+
+def test_shell_slot_in_iterator():
+    with pytest.raises(TypeError):
+        e.Shell(e.div(children=(child for child in [e.Slot("content")])))
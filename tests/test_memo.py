@@ -0,0 +1,98 @@
+import threading
+import time
+
+import liku as e
+from liku.elements import Static
+
+
+def test_memo():
+    calls = []
+
+    @e.memo
+    def Card(title: str, description: str = ""):
+        calls.append(title)
+        return e.div(children=[e.strong(children=title), e.p(children=description)])
+
+    first = Card("Hello", "world")
+    assert isinstance(first, Static)
+    assert str(first) == "<div><strong>Hello</strong><p>world</p></div>"
+    assert Card("Hello", "world") is first
+    assert Card("Other") is not first
+    assert calls == ["Hello", "Other"]
+    assert Card.__name__ == "Card"
+
+    info = Card.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 2, 0, 2)
+
+    assert Card.invalidate("Hello", "world")
+    assert not Card.invalidate("Hello", "world")
+    Card("Hello", "world")
+    assert calls == ["Hello", "Other", "Hello"]
+
+    Card.cache_clear()
+    assert Card.cache_info() == (0, 0, 0, 128, 0)
+
+
+def test_memo_typed():
+    @e.memo
+    def Item(value):
+        return e.li(children=str(value))
+
+    assert str(Item(1)) == "<li>1</li>"
+    assert str(Item(True)) == "<li>True</li>"
+    assert str(Item(value=1.0)) == "<li>1.0</li>"
+    assert Item.cache_info().currsize == 3
+
+
+def test_memo_unhashable():
+    @e.memo
+    def List(items: list[str]):
+        return e.ul(children=[e.li(children=item) for item in items])
+
+    assert str(List(["a"])) == "<ul><li>a</li></ul>"
+    assert str(List(["a"])) == "<ul><li>a</li></ul>"
+    assert List.cache_info().misses == 2
+    assert List.cache_info().currsize == 0
+
+
+def test_memo_options():
+    @e.memo(maxsize=2, freeze=False)
+    def Item(n: int):
+        return e.li(children=str(n))
+
+    tree = Item(1)
+    assert not isinstance(tree, Static)
+    assert Item(1) is tree
+    Item(2)
+    Item(3)
+    assert Item.cache_info().evictions == 1
+    assert Item(1) is not tree
+
+    @e.memo(ttl=0.01)
+    def Clock():
+        return e.time(children=str(time.monotonic()))
+
+    before = Clock()
+    assert Clock() is before
+    time.sleep(0.02)
+    assert Clock() is not before
+
+
+def test_memo_threads():
+    @e.memo(maxsize=16)
+    def Item(n: int):
+        return e.li(children=str(n))
+
+    def work():
+        for i in range(200):
+            assert str(Item(i % 32)) == f"<li>{i % 32}</li>"
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = Item.cache_info()
+    assert info.hits + info.misses == 8 * 200
+    assert info.currsize <= 16
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import liku as e
+from liku import minify
+from liku.parallel import render_parallel
+
+
+def Row(i: int):
+    return e.tr(
+        props={"class_": "row"},
+        children=[e.td(children=str(i)), e.td(children=f"<value {i}>")],
+    )
+
+
+def Report(n: int):
+    return e.html(
+        children=[
+            e.head(children=e.title(children="Report")),
+            e.body(
+                children=e.table(
+                    children=[
+                        e.thead(children=e.tr()),
+                        e.tbody(children=[Row(i) for i in range(n)]),
+                    ]
+                )
+            ),
+        ]
+    )
+
+
+def test_render_parallel():
+    page = Report(500)
+    with ThreadPoolExecutor(4) as executor:
+        assert render_parallel(page, threshold=100, executor=executor) == str(page)
+        assert render_parallel(
+            page, threshold=100, chunk_size=7, executor=executor
+        ) == str(page)
+        # Below the threshold, nothing is sent to the pool
+        assert render_parallel(page, threshold=1000, executor=executor) == str(page)
+
+        safe = e.div(children=["<b>"] * 200, safe=True)
+        assert render_parallel(safe, threshold=10, executor=executor) == str(safe)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(4)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_render_parallel_lazy():
+    def rows():
+        return e.tbody(children=(Row(i) for i in range(300)))
+
+    expected = str(rows())
+    with CountingExecutor() as executor:
+        # Children given as iterators are split like lists
+        assert render_parallel(rows(), threshold=100, executor=executor) == expected
+        assert executor.submitted > 1
+
+        executor.submitted = 0
+        page = e.tbody(children=e.For(each=range(300), children=[Row]))
+        assert render_parallel(page, threshold=100, executor=executor) == expected
+        assert executor.submitted > 1
+
+        executor.submitted = 0
+        assert render_parallel(rows(), threshold=1000, executor=executor) == expected
+        assert executor.submitted == 0
+
+
+def test_render_parallel_processes():
+    page = Report(300)
+    assert render_parallel(page, threshold=100) == str(page)
+
+
+def test_render_parallel_rejects_awaitables():
+    async def Async():
+        return "x"
+
+    coroutine = Async()
+    with pytest.raises(TypeError):
+        render_parallel(e.div(children=coroutine))
+    coroutine.close()
+
+
+def test_render_parallel_minified():
+    page = e.div(
+        children=[
+            e.pre(children=[e.span(children="a   b") for _ in range(20)]),
+            e.p(children=[e.span(children="c   d") for _ in range(20)]),
+        ]
+    )
+    minify.set_minify(True)
+    try:
+        expected = str(page)
+        assert "a   b" in expected and "c d" in expected
+        with ThreadPoolExecutor(4) as executor:
+            assert render_parallel(page, threshold=10, executor=executor) == expected
+        # The minify flag is not shared with the processes, it is sent along
+        assert render_parallel(page, threshold=10) == expected
+    finally:
+        minify.set_minify(False)
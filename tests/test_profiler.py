@@ -0,0 +1,92 @@
+import cProfile
+import json
+import sys
+
+import pytest
+
+import liku as e
+from liku.profiler import Profiler
+
+
+def Card(title: str):
+    return e.div(
+        props={"class_": "card"},
+        children=[e.strong(children=title), e.p(children="Tom & Jerry"), e.br()],
+    )
+
+
+def Page(n: int):
+    return e.main(children=[Card(f"Post {i}") for i in range(n)])
+
+
+def Maybe(show: bool):
+    return e.span(children="shown") if show else None
+
+
+def test_profiler():
+    original_init = e.HTMLElement.__init__
+    with Profiler() as profiler:
+        html = Page(10).render()
+    assert e.HTMLElement.__init__ is original_init
+
+    page = profiler.components["Page"]
+    assert (page.calls, page.nodes, page.bytes) == (1, 1, len(html))
+    card = profiler.components["Card"]
+    assert (card.calls, card.nodes) == (10, 10)
+    assert 0 < card.construct <= page.construct
+    assert 0 < card.render <= page.render
+
+    p = profiler.tags["p"]
+    assert (p.calls, p.nodes) == (10, 10)
+    assert p.bytes == len("<p>Tom &amp; Jerry</p>") * 10
+    assert p.escape > 0
+    assert profiler.tags["br"].bytes == len("<br />") * 10
+
+    report = profiler.report(sort="bytes")
+    assert report.index("Page") < report.index("Card") < report.index("main")
+    assert json.loads(profiler.to_json())["tags"]["div"]["nodes"] == 10
+
+    with pytest.raises(ValueError):
+        profiler.report(sort="unknown")
+
+
+def test_profiler_disabled():
+    with Profiler() as profiler:
+        pass
+    Page(2).render()
+    assert profiler.components == {} and profiler.tags == {}
+
+
+def test_profiler_conditional():
+    with Profiler() as profiler:
+        e.div(children=[Maybe(True), Maybe(False), Maybe(True)]).render()
+    # Still counted after returning None
+    assert profiler.components["Maybe"].calls == 2
+
+
+def test_profiler_with_cprofile():
+    # cProfile takes the tool id set aside for profilers
+    with cProfile.Profile():
+        with Profiler() as profiler:
+            Page(2).render()
+    assert profiler.components["Card"].calls == 2
+    assert sys.monitoring.get_tool(sys.monitoring.PROFILER_ID) is None
+
+
+def test_profiler_no_tool_id():
+    original_init = e.HTMLElement.__init__
+    taken = [i for i in range(2, 6) if sys.monitoring.get_tool(i) is None]
+    for tool_id in taken:
+        sys.monitoring.use_tool_id(tool_id, "test")
+    try:
+        with pytest.raises(RuntimeError):
+            with Profiler():
+                pass
+        assert e.HTMLElement.__init__ is original_init
+    finally:
+        for tool_id in taken:
+            sys.monitoring.free_tool_id(tool_id)
+
+    with Profiler() as profiler:
+        Page(1).render()
+    assert profiler.components["Card"].calls == 1
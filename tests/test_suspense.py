@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import sys
+import time
+
+import pytest
+
+import liku as e
+from liku import aio
+from liku.suspense import (
+    SWAP_FUNCTION,
+    iter_render_suspense,
+    iter_render_suspense_async,
+)
+
+
+def Slow(name: str, delay: float):
+    def build():
+        time.sleep(delay)
+        return e.p(children=name)
+
+    return build
+
+
+async def AsyncSlow(name: str, delay: float):
+    await asyncio.sleep(delay)
+    return e.p(children=name)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(4) as executor:
+        yield executor
+
+
+def test_suspense_render_in_place():
+    node = e.div(children=e.Suspense(fallback="Loading", children=Slow("Comments", 0)))
+    assert node.render() == "<div><p>Comments</p></div>"
+    # The function is only called once
+    assert node.render() == "<div><p>Comments</p></div>"
+
+
+def test_suspense_stream(executor):
+    page = e.main(
+        children=[
+            e.Suspense(fallback="Loading", children=Slow("slow", 0.2)),
+            e.Suspense(fallback=e.span(children="..."), children=Slow("fast", 0.1)),
+            e.footer(children="End"),
+        ]
+    )
+
+    start = time.perf_counter()
+    chunks = iter_render_suspense(page, chunk_size=1, executor=executor)
+    first = next(chunks)
+    assert time.perf_counter() - start < 0.1
+    html = first + "".join(chunks)
+    # Both ran concurrently
+    assert time.perf_counter() - start < 0.3
+
+    shell, rest = html.split("</main>")
+    assert shell == (
+        '<main><div id="liku-suspense-0">Loading</div>'
+        '<div id="liku-suspense-1"><span>...</span></div>'
+        "<footer>End</footer>"
+    )
+    # Sent as they finish, and the swap function is only defined once
+    assert rest == (
+        '<template id="liku-suspense-1-content"><p>fast</p></template>'
+        f'<script>{SWAP_FUNCTION};$liku("liku-suspense-1")</script>'
+        '<template id="liku-suspense-0-content"><p>slow</p></template>'
+        '<script>$liku("liku-suspense-0")</script>'
+    )
+
+
+def test_suspense_stream_htmx(executor):
+    page = e.div(
+        children=e.Suspense(
+            fallback="Loading",
+            children=e.Suspense(fallback="Still loading", children=Slow("Done", 0)),
+        )
+    )
+    html = "".join(
+        iter_render_suspense(page, executor=executor, swap="htmx", nonce="abc")
+    )
+    assert html == (
+        '<div><div id="liku-suspense-0">Loading</div></div>'
+        '<div id="liku-suspense-0" hx-swap-oob="true">'
+        '<div id="liku-suspense-1">Still loading</div></div>'
+        '<div id="liku-suspense-1" hx-swap-oob="true"><p>Done</p></div>'
+    )
+
+
+def test_suspense_stream_coroutine(executor):
+    page = e.div(children=e.Suspense(children=AsyncSlow("Async", 0)))
+    assert "".join(iter_render_suspense(page, executor=executor)) == (
+        '<div><div id="liku-suspense-0"></div></div>'
+        '<template id="liku-suspense-0-content"><p>Async</p></template>'
+        f'<script>{SWAP_FUNCTION};$liku("liku-suspense-0")</script>'
+    )
+
+
+def test_suspense_stream_async():
+    async def collect():
+        page = e.main(
+            children=[
+                e.Suspense(fallback="Loading", children=AsyncSlow("slow", 0.2)),
+                e.Suspense(fallback="Loading", children=Slow("thread", 0.1)),
+                AsyncSlow("inline", 0),
+            ]
+        )
+        start = time.perf_counter()
+        chunks = [chunk async for chunk in iter_render_suspense_async(page, nonce="n")]
+        return "".join(chunks), time.perf_counter() - start
+
+    html, elapsed = asyncio.run(collect())
+    assert elapsed < 0.3
+    assert html == (
+        '<main><div id="liku-suspense-0">Loading</div>'
+        '<div id="liku-suspense-1">Loading</div><p>inline</p></main>'
+        '<template id="liku-suspense-1-content"><p>thread</p></template>'
+        f'<script nonce="n">{SWAP_FUNCTION};$liku("liku-suspense-1")</script>'
+        '<template id="liku-suspense-0-content"><p>slow</p></template>'
+        '<script nonce="n">$liku("liku-suspense-0")</script>'
+    )
+
+
+def test_suspense_render_async():
+    page = e.div(children=e.Suspense(children=AsyncSlow("Async", 0)))
+    assert asyncio.run(aio.render_async(page)) == "<div><p>Async</p></div>"
+
+
+def test_suspense_stream_document(executor):
+    def Page():
+        return e.html(
+            children=[
+                e.head(children=e.title(children="Home")),
+                e.body(
+                    children=e.Suspense(fallback="Loading", children=Slow("Done", 0))
+                ),
+            ]
+        )
+
+    expected = (
+        "<html><head><title>Home</title></head>"
+        '<body><div id="liku-suspense-0">Loading</div>'
+        '<template id="liku-suspense-0-content"><p>Done</p></template>'
+        f'<script>{SWAP_FUNCTION};$liku("liku-suspense-0")</script>'
+        "</body></html>"
+    )
+    # The closing tags are held back until the boundaries are sent
+    chunks = list(iter_render_suspense(Page(), chunk_size=1, executor=executor))
+    assert "".join(chunks) == expected
+    assert chunks[-1] == "</body></html>"
+
+    async def collect():
+        return [chunk async for chunk in iter_render_suspense_async(Page())]
+
+    assert "".join(asyncio.run(collect())) == expected
+    assert e.Suspense().props == {}
+
+
+def test_import_is_lazy():
+    # Slow to import, only loaded once used
+    modules = ("asyncio", "concurrent.futures", "markupsafe")
+    code = f"import sys, liku; print([m for m in {modules!r} if m in sys.modules])"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"